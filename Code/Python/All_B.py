@@ -11,13 +11,13 @@
 
 # import libraries
 
-from SimPy.Simulation import *
 import random
 import numpy as np
 import math
 import pandas as pd
 import statsmodels.distributions.empirical_distribution as st
 import matplotlib.pyplot as plt
+from Run_experiment import experiment_params, load_results, theoretic_measures
 
 ## confidence intervals
 
@@ -34,10 +34,24 @@ def conf(L):
 
 ####### compare server utilisation  ################
 
-plt.plot(allB, color = "red", label = "M/M/4 simulated") # average number of customers in system
-plt.plot(allB2, color = "blue", label = "Best-fit simulated") # average number of customers in system
-plt.plot(allB3, color = "green", label = "Empirical simulated") # average number of customers in system
-plt.axhline(0.3699, color = "black", label = "theoretic", ls = "--")
-plt.title("Average utilisation: Empirical model")
-plt.legend(loc = (0.55, 0.55))
-plt.show()
+if __name__ == "__main__":
+
+    # theoretic measures of each model for its own inter-arrival and service
+    # times (M/M/4, and Allen-Cunneen G/G/4 for the others)
+    theory = {model: theoretic_measures(model) for model in ("model", "model2", "model3")}
+
+    # simulated measures of the report's experiments (the defaults of
+    # Run_experiment.py)
+    allB = load_results("model", **experiment_params("model"))["B"]
+    allB2 = load_results("model2", **experiment_params("model2"))["B"]
+    allB3 = load_results("model3", **experiment_params("model3"))["B"]
+
+    plt.plot(allB, color = "red", label = "M/M/4 simulated") # average number of customers in system
+    plt.plot(allB2, color = "blue", label = "Best-fit simulated") # average number of customers in system
+    plt.plot(allB3, color = "green", label = "Empirical simulated") # average number of customers in system
+    plt.axhline(theory["model"]["rho"], color = "red", label = "M/M/4 theoretic", ls = "--")
+    plt.axhline(theory["model2"]["rho"], color = "blue", label = "Best-fit theoretic", ls = "--")
+    plt.axhline(theory["model3"]["rho"], color = "green", label = "Empirical theoretic", ls = "--")
+    plt.title("Average utilisation: Empirical model")
+    plt.legend(loc = (0.55, 0.55))
+    plt.show()
@@ -0,0 +1,193 @@
+##############################
+#
+# Queueing system in action
+# Bueno, G and Kakau, C
+#
+##############################
+
+# time-varying arrival rates.  The Source classes of the three models assume
+# one stationary arrival rate, but the observations cover distinct sessions
+# at different times of day, and it is the peak that we staff for.
+#
+# RateProfile is a piecewise-constant or piecewise-linear arrival rate
+# lamb(t), estimated from the observed arrival times by estimate_profile().
+# Arrival times of the non-homogeneous Poisson process are generated in
+# vectorized batches, either by inverting the integrated rate
+# Lambda(t) = int lamb(s) ds (unit-rate Poisson points mapped through
+# Lambda^-1) or by thinning a homogeneous process at the maximum rate.
+
+
+# import libraries
+
+import math
+import numpy as np
+import pandas as pd
+from Lindley_engine import kiefer_wolfowitz, queue_measures
+from Random_streams import replication_streams
+
+
+class RateProfile:
+    """piecewise arrival rate lamb(t) on [breakpoints[0], breakpoints[-1]]
+
+    kind="constant": rates[i] holds on [breakpoints[i], breakpoints[i+1]),
+    so there is one rate fewer than breakpoints.  kind="linear": rates[i] is
+    the rate at breakpoints[i], linear in between.  The rate is 0 outside
+    the breakpoints.  Times are in seconds (e.g. of the day), rates in
+    arrivals per second.
+    """
+
+    def __init__(self, breakpoints, rates, kind="constant"):
+        self.breakpoints = np.asarray(breakpoints, dtype=float)
+        self.rates = np.asarray(rates, dtype=float)
+        self.kind = kind
+        if np.any(np.diff(self.breakpoints) <= 0):
+            raise ValueError("breakpoints must be increasing")
+        if np.any(self.rates < 0):
+            raise ValueError("rates must be non-negative")
+
+        # rate at the left and right end of every segment
+        if kind == "constant":
+            if len(self.rates) != len(self.breakpoints) - 1:
+                raise ValueError("a constant profile needs one rate per segment")
+            self._left, self._right = self.rates, self.rates
+        elif kind == "linear":
+            if len(self.rates) != len(self.breakpoints):
+                raise ValueError("a linear profile needs one rate per breakpoint")
+            self._left, self._right = self.rates[:-1], self.rates[1:]
+        else:
+            raise ValueError("kind must be 'constant' or 'linear', not %r" % (kind,))
+
+        self._widths = np.diff(self.breakpoints)
+        self._slopes = (self._right - self._left)/self._widths
+        # Lambda at each breakpoint
+        self.cumulative = np.concatenate(([0], np.cumsum((self._left + self._right)/2*self._widths)))
+
+    def _segment(self, t):
+        i = np.searchsorted(self.breakpoints, t, side="right") - 1
+        return np.clip(i, 0, len(self._widths) - 1)
+
+    def rate(self, t):
+        """lamb(t)"""
+        t = np.asarray(t, dtype=float)
+        i = self._segment(t)
+        inside = (t >= self.breakpoints[0]) & (t < self.breakpoints[-1])
+        return np.where(inside, self._left[i] + self._slopes[i]*(t - self.breakpoints[i]), 0.0)[()]
+
+    def integrated(self, t):
+        """Lambda(t), the expected number of arrivals from breakpoints[0] to t"""
+        t = np.clip(np.asarray(t, dtype=float), self.breakpoints[0], self.breakpoints[-1])
+        i = self._segment(t)
+        dt = t - self.breakpoints[i]
+        return (self.cumulative[i] + self._left[i]*dt + self._slopes[i]*dt*dt/2)[()]
+
+    def inverse(self, y):
+        """the time t at which Lambda(t) = y"""
+        y = np.clip(np.asarray(y, dtype=float), 0, self.cumulative[-1])
+        # last segment starting at or below y, which skips zero-rate stretches
+        i = np.clip(np.searchsorted(self.cumulative, y, side="right") - 1, 0, len(self._widths) - 1)
+        excess = y - self.cumulative[i]
+        # root of left*dt + slope*dt^2/2 = excess, in a form that is also
+        # stable for zero slope
+        with np.errstate(divide="ignore", invalid="ignore"):
+            root = np.sqrt(self._left[i]**2 + 2*self._slopes[i]*excess)
+            dt = np.where(excess > 0, 2*excess/(self._left[i] + root), 0.0)
+        return (self.breakpoints[i] + np.minimum(dt, self._widths[i]))[()]
+
+    def max_rate(self, start=None, end=None):
+        """largest rate on [start, end]"""
+        start = self.breakpoints[0] if start is None else start
+        end = self.breakpoints[-1] if end is None else end
+        # the rate is linear between breakpoints, so its maximum is at a
+        # breakpoint or at an end of the interval
+        inside = self.breakpoints[(self.breakpoints > start) & (self.breakpoints < end)]
+        t = np.concatenate(([start], inside, [np.nextafter(end, -np.inf)]))
+        return float(np.max(self.rate(t)))
+
+    def arrival_times(self, start, end, rng, method="inversion", batch=None):
+        """sorted arrival times on [start, end) of the non-homogeneous Poisson process"""
+        if method == "inversion":
+            low, high = self.integrated(start), self.integrated(end)
+            expected = high - low
+            if batch is None:
+                batch = int(expected + 4*math.sqrt(expected) + 10)
+            # unit-rate Poisson points on [low, high), a batch at a time
+            points = [low + np.cumsum(rng.exponential(1.0, batch))]
+            while points[-1][-1] < high:
+                points.append(points[-1][-1] + np.cumsum(rng.exponential(1.0, batch)))
+            points = np.concatenate(points)
+            return self.inverse(points[points < high])
+
+        if method == "thinning":
+            top = self.max_rate(start, end)
+            n = rng.poisson(top*(end - start))
+            times = np.sort(rng.uniform(start, end, n))
+            keep = rng.random(n)*top < self.rate(times)
+            return times[keep]
+
+        raise ValueError("method must be 'inversion' or 'thinning', not %r" % (method,))
+
+
+def seconds_of_day(times):
+    """seconds since midnight of datetime-like times"""
+    times = pd.to_datetime(pd.Series(times))
+    return (times - times.dt.normalize()).dt.total_seconds().to_numpy()
+
+
+def estimate_profile(arrive, session=None, bin_width=900, kind="constant"):
+    """arrival-rate profile by time of day from observed arrival times
+
+    arrive holds the arrival date-times (e.g. Date_Arrive) and session the
+    session of each arrival (default: the date).  Each session is taken to
+    be observed from its first to its last arrival; the rate in each bin of
+    bin_width seconds is the number of arrivals over the time observed in
+    that bin, across all sessions.  kind="linear" puts the bin rates at the
+    bin centres and interpolates between them.
+    """
+    arrive = pd.to_datetime(pd.Series(arrive)).reset_index(drop=True)
+    t = seconds_of_day(arrive)
+    if session is None:
+        session = arrive.dt.normalize()
+    session = pd.Series(np.asarray(session))
+
+    edges = np.arange(math.floor(t.min()/bin_width)*bin_width,
+                      t.max() + bin_width, bin_width)
+    counts = np.histogram(t, edges)[0]
+
+    # observed time in each bin, over all sessions
+    exposure = np.zeros(len(edges) - 1)
+    for key, index in session.groupby(session).groups.items():
+        first, last = t[index].min(), t[index].max()
+        exposure += np.clip(np.minimum(edges[1:], last) - np.maximum(edges[:-1], first), 0, None)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rates = np.where(exposure > 0, counts/exposure, 0.0)
+
+    if kind == "constant":
+        return RateProfile(edges, rates, "constant")
+    centres = (edges[:-1] + edges[1:])/2
+    return RateProfile(np.concatenate(([edges[0]], centres, [edges[-1]])),
+                       np.concatenate(([rates[0]], rates, [rates[-1]])), "linear")
+
+
+def simulate_profile(profile, c, service_ppf, rvseed, start=None, end=None,
+                     maxtime=math.inf, method="inversion", busy="servers"):
+    """(W, L, B) of a FCFS c-server queue fed by the time-varying arrival profile
+
+    Arrivals follow the profile on [start, end) (default: the whole
+    profile); service_ppf turns the replication's service uniforms into
+    service times.  The measures are taken from the first arrival up to
+    maxtime after it, as in model2() and model3().
+    """
+    start = profile.breakpoints[0] if start is None else start
+    end = profile.breakpoints[-1] if end is None else end
+    arrivals_rng, services_rng = replication_streams(rvseed)
+
+    times = profile.arrival_times(start, end, arrivals_rng, method)
+    if len(times) == 0:
+        raise ValueError("no arrivals between %s and %s" % (start, end))
+    services = service_ppf(services_rng.random(len(times)))
+
+    # the source keeps running until end, after the last arrival
+    interarrivals = np.diff(times, append=end)
+    arrivals, starts, departures = kiefer_wolfowitz(interarrivals, services, c)
+    return queue_measures(arrivals, departures, maxtime, end - times[0], busy, c)
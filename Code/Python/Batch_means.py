@@ -0,0 +1,222 @@
+##############################
+#
+# Queueing system in action
+# Bueno, G and Kakau, C
+#
+##############################
+
+# single-long-run estimation of W, L and B.  Instead of many short
+# replications that each start from an empty system, one long run is
+# simulated, the warm-up is detected and deleted with MSER, and confidence
+# intervals come from overlapping batch means.  Both the simulation and the
+# batching are streaming: the run never holds more than a fixed number of
+# batch totals, whatever the number of customers.
+
+
+# import libraries
+
+import heapq
+import math
+import numpy as np
+import scipy.stats as stats
+from Batch_simulation import model_inputs
+from Random_streams import model_streams
+
+
+class BatchMeans:
+    """weighted batch totals of a stream of observations in fixed memory
+
+    Observations are grouped into batches of size observations.  Whenever
+    2*batches batches are complete, neighbouring batches are merged and the
+    batch size doubles, so between batches and 2*batches batches are kept.
+    Weights allow time averages: observe the value held with the time it was
+    held as its weight.
+    """
+
+    def __init__(self, batches=256, size=5):
+        self.batches = batches
+        self.size = size                # observations per batch (MSER-5 to start with)
+        self.sums = []
+        self.weights = []
+        self.n = 0
+        self._sum = 0.0
+        self._weight = 0.0
+        self._count = 0
+
+    def observe(self, y, weight=1.0):
+        self.n += 1
+        self._sum += y*weight
+        self._weight += weight
+        self._count += 1
+        if self._count < self.size:
+            return
+
+        self.sums.append(self._sum)
+        self.weights.append(self._weight)
+        self._sum = self._weight = 0.0
+        self._count = 0
+        if len(self.sums) == 2*self.batches:
+            self.sums = [a + b for a, b in zip(self.sums[::2], self.sums[1::2])]
+            self.weights = [a + b for a, b in zip(self.weights[::2], self.weights[1::2])]
+            self.size *= 2
+
+    def means(self):
+        """the means of the complete batches"""
+        return np.array(self.sums)/np.array(self.weights)
+
+    def estimate(self, level=0.95):
+        """point estimate and confidence interval after deleting the warm-up
+
+        The warm-up is the MSER truncation point of the batch means; the
+        interval uses overlapping batch means over the remaining batches.
+        Returns a dict with estimate, lower, upper, the number of deleted
+        observations and the number of batches used.
+        """
+        sums = np.array(self.sums)
+        weights = np.array(self.weights)
+        d = mser(sums/weights)
+        sums, weights = sums[d:], weights[d:]
+
+        estimate = sums.sum()/weights.sum()
+        halfwidth = obm_half_width(sums, weights, level)
+        return {"estimate": estimate,
+                "lower": estimate - halfwidth,
+                "upper": estimate + halfwidth,
+                "deleted": d*self.size,
+                "batches": len(sums)}
+
+
+def mser(means):
+    """MSER truncation point: the number of leading batches to delete
+
+    Chooses d, at most half the batches, minimising the marginal standard
+    error sum((Y_j - mean(Y[d:]))^2)/(n - d)^2 of the remaining batch means.
+    """
+    y = np.asarray(means, dtype=float)
+    n = len(y)
+    if n < 2:
+        return 0
+    # sums and sums of squares of y[d:] for every d
+    s1 = np.cumsum(y[::-1])[::-1]
+    s2 = np.cumsum((y*y)[::-1])[::-1]
+    remaining = n - np.arange(n)
+    stat = (s2 - s1*s1/remaining)/remaining**2
+    return int(np.argmin(stat[:n//2 + 1]))
+
+
+def obm_half_width(sums, weights, level=0.95, window=None):
+    """confidence half-width of sum(sums)/sum(weights) by overlapping batch means
+
+    Every run of window consecutive batches (default about sqrt of the
+    number of batches) is one overlapping batch; degrees of freedom follow
+    Meketon and Schmeiser, 1.5*(n/window - 1).
+    """
+    sums = np.asarray(sums, dtype=float)
+    weights = np.asarray(weights, dtype=float)
+    n = len(sums)
+    if n < 2:
+        return math.inf
+    if window is None:
+        window = max(1, int(round(math.sqrt(n))))
+    window = min(window, n - 1)
+
+    grand = sums.sum()/weights.sum()
+    s = np.concatenate(([0], np.cumsum(sums)))
+    w = np.concatenate(([0], np.cumsum(weights)))
+    overlapping = (s[window:] - s[:-window])/(w[window:] - w[:-window])
+
+    # estimated variance of the grand mean
+    variance = window*np.sum((overlapping - grand)**2)/((n - window + 1)*(n - window))
+    df = 1.5*(n/window - 1)
+    return stats.t.ppf(0.5 + level/2, df)*math.sqrt(variance)
+
+
+def long_run(draw_interarrivals, draw_services, c, N, busy="servers", chunk=10000, batches=256):
+    """W, L and B of one long run of a FCFS c-server queue with N customers
+
+    draw_interarrivals(n) and draw_services(n) return arrays of n times; they
+    are called chunk customers at a time.  Customers are pushed through the
+    Kiefer-Wolfowitz recursion one by one while a heap of pending departures
+    drives the number in system, so memory stays bounded.  B is the
+    per-server utilisation, the time-average of min(n, c)/c
+    (busy="servers"), or the old busy indicator (system non-empty),
+    time-averaged (busy="time") or averaged over arrival and departure
+    events (busy="mean"), as in queue_measures().
+    Returns a dict of BatchMeans.estimate() results for W, L and B.
+    """
+    if busy not in ("servers", "time", "mean"):
+        raise ValueError("busy must be 'servers', 'time' or 'mean', not %r" % (busy,))
+    W = BatchMeans(batches)
+    L = BatchMeans(batches)
+    B = BatchMeans(batches)
+
+    free = [0.0]*c        # server-free times (workload vector)
+    leaving = []          # departure times of customers in the system
+    n = 0                 # number in system
+    last = 0.0            # time of the last event
+    arrival = 0.0
+
+    def advance(t, step):
+        nonlocal n, last
+        L.observe(n, t - last)
+        if busy == "servers":
+            B.observe(min(n, c)/c, t - last)
+        elif busy == "time":
+            B.observe(n > 0, t - last)
+        n += step
+        if busy == "mean":
+            B.observe(n > 0)
+        last = t
+
+    done = 0
+    while done < N:
+        size = min(chunk, N - done)
+        for a, s in zip(np.asarray(draw_interarrivals(size)).tolist(),
+                        np.asarray(draw_services(size)).tolist()):
+            while leaving and leaving[0] <= arrival:
+                advance(heapq.heappop(leaving), -1)
+            advance(arrival, +1)
+
+            start = max(arrival, free[0])
+            heapq.heapreplace(free, start + s)
+            heapq.heappush(leaving, start + s)
+            W.observe(start + s - arrival)
+            arrival += a
+        done += size
+
+    while leaving:
+        advance(heapq.heappop(leaving), -1)
+
+    return {"W": W.estimate(), "L": L.estimate(), "B": B.estimate()}
+
+
+###### the three models as single long runs ############################
+
+def long_queue(model, c, N, seed=None, streams="crn", **params):
+    """model as one long run of N customers
+
+    params are the model's distribution parameters (lamb and mu, or
+    arr_data and serv_data); the inter-arrival and service times are those
+    of the model (see Batch_simulation.model_inputs), drawn from its
+    streams.
+    """
+    inputs = model_inputs(model, **params)
+    arrivals, services = model_streams(streams, seed, model)
+    return long_run(lambda n: inputs["interarrival_ppf"](arrivals.random(n)),
+                    lambda n: inputs["service_ppf"](services.random(n)),
+                    c, N)
+
+
+def long_model(c, N, lamb, mu, seed=None, streams="crn"):
+    """model() as one long run"""
+    return long_queue("model", c, N, seed, streams, lamb=lamb, mu=mu)
+
+
+def long_model2(c, N, lamb, mu, seed=None, streams="crn"):
+    """model2() as one long run"""
+    return long_queue("model2", c, N, seed, streams, lamb=lamb, mu=mu)
+
+
+def long_model3(c, N, arr_data, serv_data, seed=None, streams="crn"):
+    """model3() as one long run"""
+    return long_queue("model3", c, N, seed, streams, arr_data=arr_data, serv_data=serv_data)
@@ -0,0 +1,113 @@
+##############################
+#
+# Queueing system in action
+# Bueno, G and Kakau, C
+#
+##############################
+
+# all replications of an experiment in one go: the inter-arrival and service
+# times of every replication are drawn as (reps x N) matrices and pushed
+# through the Kiefer-Wolfowitz recursion in lockstep (Lindley_engine), so
+# thousands of replications cost little more than one.
+
+
+# import libraries
+
+import numpy as np
+from Lindley_engine import simulate_replications
+from Queue_model import queue_model
+from Random_streams import model_streams
+from Replication_runner import experiment_seeds
+
+
+def draw_uniforms(seeds, N, model, streams="crn"):
+    """(reps x N) uniforms from the arrival and service streams of each seed"""
+    rngs = [model_streams(streams, seed, model) for seed in seeds]
+    return (np.array([arrivals.random(N) for arrivals, services in rngs]),
+            np.array([services.random(N) for arrivals, services in rngs]))
+
+
+def model_inputs(model, lamb=None, mu=None, arr_data=None, serv_data=None):
+    """inverse cdfs and means of the inter-arrival and service times of a model
+
+    model is "model", "model2" or "model3", with the parameters that model
+    takes.  Returns a dict with interarrival_ppf, service_ppf,
+    interarrival_mean, service_mean and busy, the model's busy measure.
+    """
+    # the same distributions as the SimPy models (see Queue_model)
+    queue = queue_model(model, None, lamb, mu, arr_data, serv_data)
+    return {"interarrival_ppf": queue.interarrival.ppf,
+            "service_ppf": queue.service.ppf,
+            "interarrival_mean": queue.interarrival.mean(),
+            "service_mean": queue.service.mean(),
+            "busy": queue.busy}
+
+
+def squared_cvs(inputs, n=200000):
+    """squared coefficients of variation of a model's inter-arrival and service times"""
+    # by inversion on an even grid of probabilities, which is exact enough
+    # for the closed-form approximations whatever the distribution
+    u = (np.arange(n) + 0.5)/n
+    cvs = []
+    for ppf in (inputs["interarrival_ppf"], inputs["service_ppf"]):
+        x = ppf(u)
+        cvs.append(np.var(x)/np.mean(x)**2)
+    return cvs
+
+
+def run_batch(interarrival_ppf, service_ppf, c, N, maxtime, seeds, model,
+              streams="crn", busy="servers", chunk=500):
+    """per-replication performance measures, chunk replications at a time
+
+    Replication k draws its uniforms from the arrival and service streams of
+    seeds[k] (see Random_streams), and interarrival_ppf and service_ppf turn
+    them into times, so each replication is the same as one run of the model
+    with engine="lindley" and the same streams.  Returns a dict of arrays
+    allW, allL, allB and allLambdaEffective with one entry per replication,
+    as in the experiment loops of the simulation scripts.
+    """
+    seeds = list(seeds)
+    allW, allL, allB = [], [], []
+    for first in range(0, len(seeds), chunk):
+        u_arrivals, u_services = draw_uniforms(seeds[first:first + chunk], N, model, streams)
+        interarrivals = interarrival_ppf(u_arrivals)
+        services = service_ppf(u_services)
+        W, L, B = simulate_replications(interarrivals, services, c, maxtime, busy)
+        allW.append(W)
+        allL.append(L)
+        allB.append(B)
+
+    allW = np.concatenate(allW)
+    allL = np.concatenate(allL)
+    allB = np.concatenate(allB)
+    return {"allW": allW,
+            "allL": allL,
+            "allB": allB,
+            "allLambdaEffective": allL/allW}
+
+
+###### M/M/4 model ############################
+
+def batch_model(c, N, lamb, mu, maxtime, reps, streams="crn", step=123):
+    """model() for the seeds step*k, k < reps, at once"""
+    inputs = model_inputs("model", lamb=lamb, mu=mu)
+    return run_batch(inputs["interarrival_ppf"], inputs["service_ppf"],
+                     c, N, maxtime, experiment_seeds(reps, step), "model", streams, inputs["busy"])
+
+
+###### Best fit model ############################
+
+def batch_model2(c, N, lamb, mu, maxtime, reps, streams="crn", step=123):
+    """model2() for the seeds step*k, k < reps, at once"""
+    inputs = model_inputs("model2", lamb=lamb, mu=mu)
+    return run_batch(inputs["interarrival_ppf"], inputs["service_ppf"],
+                     c, N, maxtime, experiment_seeds(reps, step), "model2", streams, inputs["busy"])
+
+
+###### Empirical model ############################
+
+def batch_model3(c, N, maxtime, reps, arr_data, serv_data, streams="crn", step=123):
+    """model3() for the seeds step*k, k < reps, at once"""
+    inputs = model_inputs("model3", arr_data=arr_data, serv_data=serv_data)
+    return run_batch(inputs["interarrival_ppf"], inputs["service_ppf"],
+                     c, N, maxtime, experiment_seeds(reps, step), "model3", streams, inputs["busy"])
@@ -0,0 +1,230 @@
+##############################
+#
+# Queueing system in action
+# Bueno, G and Kakau, C
+#
+##############################
+
+# timings of the three models on each engine, written to a json file so that
+# versions can be compared.
+#
+#   python Benchmark.py                      # full grid
+#   python Benchmark.py --quick              # small grid, a few seconds
+#   python Benchmark.py --compare old.json   # ratios against an earlier run
+#
+# Every case runs reps replications of one model with N customers and c
+# servers at utilisation rho, in this process, and records customers and
+# replications per second (best of repeat runs).  Engines: "simpy" (the
+# customer processes on the event kernel), "lindley" (the array recursion,
+# one replication per call) and "batch" (all replications at once, see
+# Batch_simulation).  The empirical model's utilisation is set by its data,
+# so only c changes it.
+# draw_empirical() is timed on its own against EmpiricalDistribution, both
+# drawing from the raw observed service times as the original model3 did.
+
+
+# import libraries
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import numpy as np
+
+
+OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                          "..", "..", "Outputs", "Tests")
+
+ENGINES = ("simpy", "lindley", "batch")
+
+# grids of the full and the quick run
+GRID = {"models": ("model", "model2", "model3"),
+        "engines": ENGINES,
+        "N": (1000, 10000),
+        "c": (1, 4),
+        "rho": (0.5, 0.9),
+        "reps": 5}
+
+QUICK_GRID = {"models": ("model", "model2", "model3"),
+              "engines": ENGINES,
+              "N": (1000,),
+              "c": (4,),
+              "rho": (0.7,),
+              "reps": 2}
+
+# service rate of the original experiments
+MU = 1/34.00496
+
+# no customer is cut off by maxtime
+MAXTIME = 1e12
+
+
+def timed(function, repeat=3):
+    """best wall-clock time (s) of repeat calls of function"""
+    best = float("inf")
+    for i in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def empirical_data():
+    """inter-arrival and service distributions of the empirical model"""
+    from Data_loading import load_data
+    from Distribution_index import DistributionIndex
+    return DistributionIndex(load_data()).get()
+
+
+def arrival_rate(model, rho, c, mu=MU):
+    """lamb giving utilisation rho with c servers of rate mu"""
+    # model2's gamma(2, 2/lamb) inter-arrival times have mean 4/lamb
+    return rho*c*mu*(4 if model == "model2" else 1)
+
+
+def case_runner(model, engine, N, c, rho, reps, data):
+    """function running one benchmark case, and the case's actual utilisation"""
+    from Batch_simulation import batch_model, batch_model2, batch_model3
+    from Replication_runner import experiment_seeds
+    seeds = experiment_seeds(reps)
+
+    if model == "model3":
+        arr_data, serv_data = data
+        rho = serv_data.mean()/(arr_data.mean()*c)
+        if engine == "batch":
+            return (lambda: batch_model3(c, N, MAXTIME, reps, arr_data, serv_data), rho)
+        from Empirical_simulation import model3
+        return (lambda: [model3(c, N, MAXTIME, seed, arr_data, serv_data, engine=engine)
+                         for seed in seeds], rho)
+
+    lamb = arrival_rate(model, rho, c)
+    if engine == "batch":
+        batch = batch_model if model == "model" else batch_model2
+        return (lambda: batch(c, N, lamb, MU, MAXTIME, reps), rho)
+    if model == "model":
+        from MM4_simulation import model as function
+    else:
+        from Best_fit_simulation import model2 as function
+    return (lambda: [function(c, N, lamb, MU, MAXTIME, seed, engine=engine)
+                     for seed in seeds], rho)
+
+
+def benchmark_models(grid=GRID, repeat=3, data=None):
+    """timings of every model, engine, N, c and rho in grid"""
+    data = empirical_data() if data is None else data
+    results = []
+    for model, engine, N, c, rho in itertools.product(grid["models"], grid["engines"],
+                                                      grid["N"], grid["c"], grid["rho"]):
+        if model == "model3" and rho != grid["rho"][0]:
+            continue  # utilisation comes from the data
+        run, actual_rho = case_runner(model, engine, N, c, rho, grid["reps"], data)
+        seconds = timed(run, repeat)
+        results.append({"name": "%s/%s/N=%d/c=%d/rho=%.2f" % (model, engine, N, c, actual_rho),
+                        "model": model, "engine": engine, "N": N, "c": c,
+                        "rho": float(actual_rho), "reps": grid["reps"],
+                        "seconds": seconds,
+                        "customers_per_second": grid["reps"]*N/seconds,
+                        "replications_per_second": grid["reps"]/seconds})
+    return results
+
+
+def service_observations():
+    """the observed service times, as the original model3 drew from them"""
+    from Data_loading import load_data
+    return load_data()["Serv_time_sec"].tolist()
+
+
+def benchmark_draws(n=1000, repeat=3, observations=None):
+    """time per draw of draw_empirical() and of EmpiricalDistribution
+
+    Both draw from the raw observations (by default the 403 service times),
+    and are first checked to give the same draws.
+    """
+    from Empirical_distribution import EmpiricalDistribution
+    from Empirical_simulation import draw_empirical
+    raw = service_observations() if observations is None else list(observations)
+    distribution = EmpiricalDistribution(raw)
+    u = np.random.default_rng(0).random(n)
+
+    check = u[:100]
+    if not np.allclose([draw_empirical(raw, r) for r in check], distribution.ppf(check)):
+        raise RuntimeError("draw_empirical and EmpiricalDistribution draw differently")
+
+    cases = {"draw_empirical": lambda: [draw_empirical(raw, r) for r in u],
+             "EmpiricalDistribution.draw": lambda: [distribution.draw(r) for r in u],
+             "EmpiricalDistribution.ppf": lambda: distribution.ppf(u)}
+    results = []
+    for name, run in cases.items():
+        seconds = timed(run, repeat)
+        results.append({"name": name, "draws": n, "observations": len(raw),
+                        "seconds": seconds, "draws_per_second": n/seconds})
+    return results
+
+
+def environment():
+    """versions and machine of a benchmark run"""
+    import scipy
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        commit = ""
+    return {"time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": commit,
+            "python": sys.version.split()[0],
+            "numpy": np.__version__,
+            "scipy": scipy.__version__,
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+            "cpus": os.cpu_count()}
+
+
+def compare(old, new):
+    """speed-up of every case of new over old (benchmark dicts), by name"""
+    before = {case["name"]: case["seconds"] for case in old["models"] + old["draws"]}
+    return {case["name"]: before[case["name"]]/case["seconds"]
+            for case in new["models"] + new["draws"] if case["name"] in before}
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Benchmark the queueing models and engines.")
+    p.add_argument("--quick", action="store_true", help="small grid")
+    p.add_argument("--repeat", type=int, default=3, help="runs per case, the best is kept")
+    p.add_argument("--out", help="json file (default Outputs/Tests/benchmark-<time>.json)")
+    p.add_argument("--compare", help="earlier json file to compare against")
+    args = p.parse_args(argv)
+
+    data = empirical_data()
+    grid = QUICK_GRID if args.quick else GRID
+    results = {"environment": environment(),
+               "grid": grid,
+               "models": benchmark_models(grid, args.repeat, data),
+               "draws": benchmark_draws(repeat=args.repeat)}
+
+    for case in results["models"]:
+        print("%-40s %12.0f customers/s %10.2f replications/s"
+              % (case["name"], case["customers_per_second"], case["replications_per_second"]))
+    for case in results["draws"]:
+        print("%-40s %12.0f draws/s" % (case["name"], case["draws_per_second"]))
+
+    out = args.out or os.path.join(OUTPUT_DIR, "benchmark-%s.json"
+                                   % time.strftime("%Y%m%d-%H%M%S"))
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(results, f, indent=2)
+    print("Benchmark written to", out)
+
+    if args.compare:
+        with open(args.compare) as f:
+            old = json.load(f)
+        for name, speedup in compare(old, results).items():
+            print("%-40s %6.2fx" % (name, speedup))
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -11,13 +11,13 @@
 
 # import libraries
 
-from SimPy.Simulation import *
 import random
 import numpy as np
 import math
 import pandas as pd
 import statsmodels.distributions.empirical_distribution as st
 import matplotlib.pyplot as plt
+from Run_experiment import experiment_params, load_results, theoretic_measures
 
 ## confidence intervals
 
@@ -34,9 +34,18 @@ def conf(L):
 
 ######## Plot performance measures against baseline estimates ######
 
+if __name__ == "__main__":
 
-plt.plot(allB2, color = "orange", label = "simulated") # average utilisation rate
-plt.axhline(0.3699, color = "orangered", label = "theoretic", ls = "--")
-plt.title("Average utilisation: Best-fit model")
-plt.legend()
-plt.show()
+    # theoretic G/G/4 measures (Allen-Cunneen) for the gamma inter-arrival and
+    # exponential service times of the simulation
+    theory = theoretic_measures("model2")
+
+    # simulated measures of the report's experiments (the defaults of
+    # Run_experiment.py)
+    allB2 = load_results("model2", **experiment_params("model2"))["B"]
+
+    plt.plot(allB2, color = "orange", label = "simulated") # average utilisation rate
+    plt.axhline(theory["rho"], color = "orangered", label = "theoretic", ls = "--")
+    plt.title("Average utilisation: Best-fit model")
+    plt.legend()
+    plt.show()
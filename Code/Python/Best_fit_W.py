@@ -11,13 +11,13 @@
 
 # import libraries
 
-from SimPy.Simulation import *
 import random
 import numpy as np
 import math
 import pandas as pd
 import statsmodels.distributions.empirical_distribution as st
 import matplotlib.pyplot as plt
+from Run_experiment import experiment_params, load_results, theoretic_measures
 
 ## confidence intervals
 
@@ -34,10 +34,18 @@ def conf(L):
 
 ######## Plot performance measures against baseline estimates ######
 
+if __name__ == "__main__":
 
-plt.plot(allW2, color = "green", label = "simulated") # average time in the system
-plt.axhline(38.2559, color = "lime", label = "theoretic", ls = "--")
-plt.title("Average time (s) in the system: Best-fit model")
-plt.legend()
-plt.show()
+    # theoretic G/G/4 measures (Allen-Cunneen) for the gamma inter-arrival and
+    # exponential service times of the simulation
+    theory = theoretic_measures("model2")
 
+    # simulated measures of the report's experiments (the defaults of
+    # Run_experiment.py)
+    allW2 = load_results("model2", **experiment_params("model2"))["W"]
+
+    plt.plot(allW2, color = "green", label = "simulated") # average time in the system
+    plt.axhline(theory["W"], color = "lime", label = "theoretic", ls = "--")
+    plt.title("Average time (s) in the system: Best-fit model")
+    plt.legend()
+    plt.show()
@@ -0,0 +1,150 @@
+##############################
+#
+# Queueing system in action
+# Bueno, G and Kakau, C
+#
+##############################
+
+# read in the observations once, in one place.
+#
+# load_data() parses the csv file (dates and times combined, day first),
+# checks the columns, and adds the inter-arrival time of every customer
+# within its session.  The parsed table is cached in a .npz file named after
+# the hash of the csv file and the version of the parsing, so later runs skip
+# the parsing until the data or parse_data() change.
+
+
+# import libraries
+
+import hashlib
+import os
+import warnings
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            "..", "..", "Data", "csv", "ProjectData-G1.csv")
+
+REQUIRED_COLUMNS = ("Date", "Session", "Servers", "Arrive", "Lane",
+                    "Serv_start", "Serv_end", "Serv_time_sec")
+
+# version of the parsed table: raise it whenever parse_data() changes what it
+# returns, so that caches of the older parsing are not read
+CACHE_VERSION = 1
+
+
+def file_hash(path, block=1 << 20):
+    """sha256 hex digest of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(block), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def arrival_times(data):
+    """arrival date-times of the observations, from Date_Arrive or Date and Arrive"""
+    if "Date_Arrive" in data.columns:
+        return pd.to_datetime(data["Date_Arrive"])
+    return pd.to_datetime(data["Date"] + " " + data["Arrive"], dayfirst=True)
+
+
+def interarrival_times(data, by=("Session",)):
+    """inter-arrival times (s) between consecutive arrivals within each group of by
+
+    The first arrival of each group has no inter-arrival time (NaN).
+    """
+    times = arrival_times(data)
+    order = times.sort_values(kind="stable").index
+    gaps = times.loc[order].groupby([data.loc[order, k] for k in by]).diff()
+    return gaps.dt.total_seconds().reindex(data.index)
+
+
+def validate(data):
+    """check the observation table, raising ValueError if it cannot be used"""
+    missing = [column for column in REQUIRED_COLUMNS if column not in data.columns]
+    if missing:
+        raise ValueError("missing columns: %s" % ", ".join(missing))
+
+    for column in ("Serv_time_sec", "inter.arr.sec"):
+        if column not in data.columns:
+            continue
+        values = pd.to_numeric(data[column], errors="coerce")
+        if values.isna().any():
+            raise ValueError("%s has %d missing or non-numeric values"
+                             % (column, values.isna().sum()))
+        if (values < 0).any():
+            raise ValueError("%s has %d negative values" % (column, (values < 0).sum()))
+
+
+def parse_data(path=DEFAULT_PATH):
+    """observation table from the csv file, without the cache"""
+    raw_data = pd.read_csv(path)
+    validate(raw_data)
+
+    data = pd.DataFrame({"Session": raw_data["Session"].to_numpy(),
+                         "Servers": raw_data["Servers"].to_numpy(),
+                         "Lane": raw_data["Lane"].to_numpy()})
+    for column in ("Arrive", "Serv_start", "Serv_end"):
+        times = pd.to_datetime(raw_data["Date"] + " " + raw_data[column], dayfirst=True)
+        data["Date_" + column] = times.astype("datetime64[ns]")
+    # service past midnight: times more than half a day before the arrival
+    # belong to the next day (a few seconds before are recording errors)
+    for column in ("Date_Serv_start", "Date_Serv_end"):
+        before = data[column] < data["Date_Arrive"] - pd.Timedelta(hours=12)
+        data.loc[before, column] += pd.Timedelta(days=1)
+
+    data["Serv_time_sec"] = pd.to_numeric(raw_data["Serv_time_sec"])
+    if "inter.arr.sec" in raw_data.columns:
+        data["inter.arr.sec"] = pd.to_numeric(raw_data["inter.arr.sec"])
+    data["Interarrival_sec"] = interarrival_times(data)
+
+    recorded = (data["Date_Serv_end"] - data["Date_Serv_start"]).dt.total_seconds()
+    mismatched = int((recorded != data["Serv_time_sec"]).sum())
+    if mismatched:
+        warnings.warn("%d rows have Serv_time_sec different from Serv_end - Serv_start"
+                      % mismatched)
+    return data
+
+
+def _save_cache(data, cache_path):
+    arrays = {column: data[column].to_numpy() for column in data.columns}
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    # written under a temporary name, so a half-written cache is never read
+    temporary = cache_path + ".%d.tmp" % os.getpid()
+    with open(temporary, "wb") as f:
+        np.savez(f, columns=np.array(list(data.columns)), **arrays)
+    os.replace(temporary, cache_path)
+
+
+def _load_cache(cache_path):
+    with np.load(cache_path, allow_pickle=False) as cached:
+        columns = [str(column) for column in cached["columns"]]
+        return pd.DataFrame({column: cached[column] for column in columns})
+
+
+def cache_file(path=DEFAULT_PATH, cache_dir=None):
+    """cache file of the csv file at path, named after its hash and CACHE_VERSION"""
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(path)), ".cache")
+    name = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_dir, "%s-v%d-%s.npz" % (name, CACHE_VERSION, file_hash(path)[:16]))
+
+
+def load_data(path=DEFAULT_PATH, cache=True, cache_dir=None):
+    """observation table, parsed from the csv file or read from its cache
+
+    Columns: Session, Servers, Lane, Date_Arrive, Date_Serv_start,
+    Date_Serv_end, Serv_time_sec, inter.arr.sec (if recorded) and
+    Interarrival_sec, the inter-arrival time within the session (NaN for
+    the first arrival of each session).
+    """
+    if not cache:
+        return parse_data(path)
+    cache_path = cache_file(path, cache_dir)
+    if os.path.exists(cache_path):
+        return _load_cache(cache_path)
+    data = parse_data(path)
+    _save_cache(data, cache_path)
+    return data
@@ -0,0 +1,218 @@
+##############################
+#
+# Queueing system in action
+# Bueno, G and Kakau, C
+#
+##############################
+
+# fixed-memory distributions of the waiting and sojourn times.
+#
+# The models only report the mean time in system W, but the service targets
+# are percentiles (P95 wait) and tail probabilities (P(wait > 2 min)).
+# Keeping every customer's delay to compute them takes memory proportional to
+# N, so each replication fills a LogHistogram instead: counts in buckets
+# whose width grows with the value, so that every quantile is within a fixed
+# relative error (1% by default) of the exact one, and the memory is set by
+# the range of values (about 1150 counts from 1 ms to 10^7 s), not by N.
+# Histograms of the same layout are merged by adding their counts, so the
+# replications of an experiment pool into one distribution.
+#
+# Delays holds the pair of histograms of one run: the wait in queue (service
+# start - arrival, zero for a customer served at once) and the sojourn time
+# (departure - arrival, the delay W is the mean of).
+
+
+# import libraries
+
+import math
+import numpy as np
+
+
+# percentiles and wait thresholds (s) reported by default
+PERCENTILES = (0.5, 0.9, 0.95, 0.99)
+THRESHOLDS = (60, 120, 300)
+
+
+class LogHistogram:
+    """histogram of non-negative values in buckets of constant relative width
+
+    Bucket i holds the values in (gamma^(i-1), gamma^i] scaled by low, with
+    gamma = (1 + relative_error)/(1 - relative_error).  Zeros are counted
+    apart and exactly; values below low or above high are counted in the
+    first and last bucket.
+    """
+
+    def __init__(self, relative_error=0.01, low=1e-3, high=1e7):
+        if not 0 < relative_error < 1:
+            raise ValueError("relative_error must be in (0, 1), not %r" % (relative_error,))
+        if not 0 < low < high:
+            raise ValueError("need 0 < low < high")
+        self.relative_error = relative_error
+        self.low = low
+        self.high = high
+        self.gamma = (1 + relative_error)/(1 - relative_error)
+        self._log_gamma = math.log(self.gamma)
+        self.counts = np.zeros(self._index(high) + 1, dtype=np.int64)
+        self.zeros = 0
+        self.n = 0
+        self._sum = 0.0
+        self._min = math.inf
+        self._max = -math.inf
+
+    def _index(self, y):
+        return math.ceil(math.log(y/self.low)/self._log_gamma)
+
+    def _value(self, i):
+        """representative value of bucket i (within relative_error of all its values)"""
+        return self.low*2*self.gamma**i/(self.gamma + 1)
+
+    def observe(self, y):
+        if y < 0:
+            raise ValueError("negative value %r" % (y,))
+        self.n += 1
+        self._sum += y
+        if y < self._min: self._min = y
+        if y > self._max: self._max = y
+        if y == 0:
+            self.zeros += 1
+        elif y <= self.low:
+            self.counts[0] += 1
+        elif y >= self.high:
+            self.counts[-1] += 1
+        else:
+            self.counts[self._index(y)] += 1
+
+    def observe_many(self, values):
+        """observe every value of an array"""
+        values = np.asarray(values, dtype=float).ravel()
+        if len(values) == 0:
+            return
+        if values.min() < 0:
+            raise ValueError("negative values")
+        self.n += len(values)
+        self._sum += float(values.sum())
+        self._min = min(self._min, float(values.min()))
+        self._max = max(self._max, float(values.max()))
+        positive = values[values > 0]
+        self.zeros += len(values) - len(positive)
+        index = np.ceil(np.log(np.clip(positive, self.low, self.high)/self.low)/self._log_gamma)
+        index = np.clip(index.astype(np.int64), 0, len(self.counts) - 1)
+        self.counts += np.bincount(index, minlength=len(self.counts))
+
+    def compatible(self, other):
+        return (self.relative_error, self.low, self.high) == \
+               (other.relative_error, other.low, other.high)
+
+    def merge(self, other):
+        """add other's observations to this histogram (same layout)"""
+        if not self.compatible(other):
+            raise ValueError("histograms with different buckets cannot be merged")
+        self.counts += other.counts
+        self.zeros += other.zeros
+        self.n += other.n
+        self._sum += other._sum
+        self._min = min(self._min, other._min)
+        self._max = max(self._max, other._max)
+        return self
+
+    def count(self):
+        return self.n
+
+    def __len__(self):
+        return self.n
+
+    def mean(self):
+        """exact mean of the observed values"""
+        if self.n == 0:
+            return None
+        return self._sum/self.n
+
+    def min(self):
+        return self._min if self.n else None
+
+    def max(self):
+        return self._max if self.n else None
+
+    def quantile(self, p):
+        """the p-quantile, within relative_error of the exact one"""
+        if not 0 <= p <= 1:
+            raise ValueError("p must be in [0, 1], not %r" % (p,))
+        if self.n == 0:
+            return None
+        rank = p*(self.n - 1)
+        if rank < self.zeros:
+            return 0.0
+        cumulative = self.zeros + np.cumsum(self.counts)
+        i = int(np.searchsorted(cumulative, rank, side="right"))
+        return min(max(self._value(i), self._min), self._max)
+
+    def exceedance(self, t):
+        """fraction of the values above t, P(X > t)
+
+        Buckets wholly above t count in full; the bucket holding t counts
+        in proportion (on the log scale) to its part above t.
+        """
+        if self.n == 0:
+            return None
+        if t < 0:
+            return 1.0
+        if t >= self._max:
+            return 0.0
+        if t < self.low:
+            # the first bucket holds (0, low], taken as uniform
+            positive = self.n - self.zeros
+            return float(positive - self.counts[0]*t/self.low)/self.n
+        i = min(self._index(t), len(self.counts) - 1)
+        above = self.counts[i + 1:].sum()
+        upper = math.log(t/self.low)/self._log_gamma
+        fraction = i - upper if i > 0 else 0.0
+        return float(above + self.counts[i]*fraction)/self.n
+
+
+class Delays:
+    """waits in queue and sojourn times of the customers of one or more runs"""
+
+    def __init__(self, relative_error=0.01, low=1e-3, high=1e7):
+        self.wait = LogHistogram(relative_error, low, high)
+        self.sojourn = LogHistogram(relative_error, low, high)
+
+    def observe(self, wait, sojourn):
+        self.wait.observe(wait)
+        self.sojourn.observe(sojourn)
+
+    def observe_many(self, waits, sojourns):
+        self.wait.observe_many(waits)
+        self.sojourn.observe_many(sojourns)
+
+    def merge(self, other):
+        """add other's customers to these histograms"""
+        self.wait.merge(other.wait)
+        self.sojourn.merge(other.sojourn)
+        return self
+
+    def report(self, percentiles=PERCENTILES, thresholds=THRESHOLDS):
+        """means, percentiles and P(wait > t) as a dict
+
+        Keys are wait_mean, sojourn_mean, wait_p95 (for p = 0.95),
+        sojourn_p95, ... and wait_over_120 for P(wait > 120).
+        """
+        report = {"customers": self.wait.count(),
+                  "wait_mean": self.wait.mean(),
+                  "sojourn_mean": self.sojourn.mean()}
+        for name, histogram in (("wait", self.wait), ("sojourn", self.sojourn)):
+            for p in percentiles:
+                report["%s_p%s" % (name, "%g" % (100*p))] = histogram.quantile(p)
+        for t in thresholds:
+            report["wait_over_%g" % t] = self.wait.exceedance(t)
+        return report
+
+
+def merge(delays):
+    """one Delays of all the runs in delays"""
+    delays = list(delays)
+    if not delays:
+        return Delays()
+    total = Delays(delays[0].wait.relative_error, delays[0].wait.low, delays[0].wait.high)
+    for d in delays:
+        total.merge(d)
+    return total
@@ -0,0 +1,396 @@
+##############################
+#
+# Queueing system in action
+# Bueno, G and Kakau, C
+#
+##############################
+
+# maximum likelihood fits of the inter-arrival and service times, with
+# goodness-of-fit tests, in Python.
+#
+#   python Distribution_fitting.py                        # both columns, all families
+#   python Distribution_fitting.py --column Serv_time_sec --families exponential gamma
+#
+# The R notebook (Code/R/WellingtonTrainStation_distributions.Rmd) compares
+# candidates such as Exp(1/lambda) and Gamma(2, 2/lambda) by drawing random
+# variates from each and chi-square testing the binned draws against the
+# binned data; the winner is then typed into Best_fit_simulation.py.  Here
+# every family is fitted by maximum likelihood and tested against its exact
+# cdf, so the result does not depend on random draws, and the fit gives a
+# distribution object that QueueModel takes directly (Fit.sampler()).
+#
+# The times are recorded in whole seconds, so with resolution=1 an
+# observation x stands for the interval [x - 1/2, x + 1/2) (from 0 for
+# x = 0): the likelihood is the probability of those intervals, and the
+# tests compare counts and cdfs at the interval edges.  Without a resolution
+# the data are taken as exact.  Likelihoods are evaluated on the distinct
+# values with their counts, so refitting takes milliseconds.
+
+
+# import libraries
+
+import argparse
+import math
+import numpy as np
+import pandas as pd
+import scipy.stats as stats
+from scipy import optimize, special
+
+
+###### families ############################
+
+def _exponential(x):
+    return {"scale": x.mean()}
+
+
+def _gamma(x):
+    # Newton's method on log(a) - digamma(a) = log(mean) - mean(log x),
+    # from the usual closed-form starting value
+    s = math.log(x.mean()) - np.log(x).mean()
+    a = (3 - s + math.sqrt((s - 3)**2 + 24*s))/(12*s)
+    for i in range(20):
+        step = (math.log(a) - special.digamma(a) - s)/(1/a - special.polygamma(1, a))
+        a = max(a - step, a/10)
+        if abs(step) < 1e-10*a:
+            break
+    return {"a": a, "scale": x.mean()/a}
+
+
+def _erlang(shape):
+    def estimate(x):
+        return {"scale": x.mean()/shape}
+    return estimate
+
+
+def _lognormal(x):
+    logs = np.log(x)
+    return {"s": logs.std(), "scale": math.exp(logs.mean())}
+
+
+def _weibull(x):
+    logs = np.log(x)
+    def score(c):
+        w = (x/x.max())**c
+        return 1/c + logs.mean() - np.sum(w*logs)/np.sum(w)
+    c = optimize.brentq(score, 1e-3, 1e3)
+    return {"c": c, "scale": np.mean(x**c)**(1/c)}
+
+
+class Family:
+    """a parametric family: a scipy.stats distribution with some parameters fixed
+
+    free are the parameters fitted, and estimate(x) gives their maximum
+    likelihood estimates from exact observations x > 0.
+    """
+
+    def __init__(self, name, distribution, free, estimate, fixed=None):
+        self.name = name
+        self.distribution = distribution
+        self.free = free
+        self.estimate = estimate
+        self.fixed = fixed or {}
+
+    def __repr__(self):
+        return "Family(%r)" % self.name
+
+
+# the candidates of the R notebook (exponential, gamma with shape 2 or 3)
+# and a few other two-parameter families
+FAMILIES = {
+    "exponential": Family("exponential", stats.expon, ("scale",), _exponential),
+    "gamma": Family("gamma", stats.gamma, ("a", "scale"), _gamma),
+    "gamma2": Family("gamma2", stats.gamma, ("scale",), _erlang(2), {"a": 2}),
+    "gamma3": Family("gamma3", stats.gamma, ("scale",), _erlang(3), {"a": 3}),
+    "lognormal": Family("lognormal", stats.lognorm, ("s", "scale"), _lognormal),
+    "weibull": Family("weibull", stats.weibull_min, ("c", "scale"), _weibull),
+}
+
+
+###### fitting ############################
+
+def _cells(x, resolution):
+    """distinct values of x, their counts and the intervals they stand for"""
+    values, counts = np.unique(x, return_counts=True)
+    lower = np.maximum(values - resolution/2, 0)
+    upper = values + resolution/2
+    return values, counts, lower, upper
+
+
+class Fit:
+    """a distribution of family fitted to n observations"""
+
+    def __init__(self, family, params, loglik, n, resolution=None):
+        self.family = family
+        self.params = params
+        self.loglik = loglik
+        self.n = n
+        self.resolution = resolution
+
+    def __repr__(self):
+        return "Fit(%s)" % self.describe()
+
+    def describe(self):
+        params = ", ".join("%s=%.6g" % item for item in self.all_params().items())
+        return "%s(%s)" % (self.family.name, params)
+
+    def all_params(self):
+        return dict(self.family.fixed, **self.params)
+
+    def distribution(self):
+        """the fitted distribution as a frozen scipy.stats distribution"""
+        return self.family.distribution(**self.all_params())
+
+    def mean(self):
+        return float(self.distribution().mean())
+
+    def aic(self):
+        return 2*len(self.params) - 2*self.loglik
+
+    def bic(self):
+        return len(self.params)*math.log(self.n) - 2*self.loglik
+
+    def sampler(self):
+        """the fitted distribution as a Queue_model distribution, for QueueModel"""
+        from Queue_model import Exponential, Fitted, Gamma
+        params = self.all_params()
+        if self.family.distribution is stats.expon:
+            return Exponential(1/params["scale"])
+        if self.family.distribution is stats.gamma:
+            return Gamma(params["a"], params["scale"])
+        return Fitted(self.distribution())
+
+
+def loglikelihood(family, params, x, resolution=None):
+    """log-likelihood of params of family for the observations x"""
+    distribution = family.distribution
+    params = dict(family.fixed, **params)
+    if resolution is None:
+        return float(np.sum(distribution.logpdf(x, **params)))
+    values, counts, lower, upper = _cells(x, resolution)
+    return _interval_loglik(distribution, params, counts, lower, upper)
+
+
+def _interval_loglik(distribution, params, counts, lower, upper):
+    """log-likelihood of counts observations in the intervals [lower, upper)"""
+    # differences of the cdf below the median and of the survival function
+    # above it, which do not round to zero in the tails
+    edges = np.concatenate((lower, upper))
+    cdf = distribution.cdf(edges, **params)
+    sf = distribution.sf(edges, **params)
+    n = len(lower)
+    probabilities = np.where(cdf[:n] > 0.5, sf[:n] - sf[n:], cdf[n:] - cdf[:n])
+    with np.errstate(divide="ignore"):
+        return float(np.sum(counts*np.log(probabilities)))
+
+
+def fit(x, family, resolution=None):
+    """maximum likelihood Fit of family (a name or a Family) to the observations x
+
+    With a resolution the likelihood is that of the intervals the rounded
+    observations stand for, maximised numerically from the estimate for
+    exact data.  Zeros, which only rounded data can hold, are taken as a
+    quarter of the resolution (or half the smallest positive value) in that
+    starting estimate.
+    """
+    if isinstance(family, str):
+        family = FAMILIES[family]
+    x = np.asarray(x, dtype=float)
+    x = x[~np.isnan(x)]
+    if len(x) == 0 or x.min() < 0:
+        raise ValueError("need at least one observation, and no negative ones")
+
+    positive = x[x > 0]
+    if len(positive) == 0:
+        raise ValueError("all observations are zero")
+    floor = resolution/4 if resolution else positive.min()/2
+    params = {name: float(value) for name, value in
+              family.estimate(np.where(x > 0, x, floor)).items()}
+    if resolution is None:
+        return Fit(family, params, loglikelihood(family, params, x), len(x))
+
+    # binned likelihood, over the logarithms of the (positive) parameters
+    names = family.free
+    values, counts, lower, upper = _cells(x, resolution)
+    def negative(theta):
+        params = dict(family.fixed, **dict(zip(names, np.exp(theta))))
+        value = _interval_loglik(family.distribution, params, counts, lower, upper)
+        return -value if math.isfinite(value) else math.inf
+    start = np.log([params[name] for name in names])
+    result = optimize.minimize(negative, start, method="Nelder-Mead",
+                               options={"xatol": 1e-6, "fatol": 1e-8})
+    params = {name: float(value) for name, value in zip(names, np.exp(result.x))}
+    return Fit(family, params, -result.fun, len(x), resolution)
+
+
+def fit_families(x, families=tuple(FAMILIES), resolution=None):
+    """Fit of every family to x, best (lowest AIC) first"""
+    return sorted((fit(x, family, resolution) for family in families), key=Fit.aic)
+
+
+###### goodness of fit ############################
+
+def chi_square(x, fit, bins=None, resolution=None, min_expected=5):
+    """Pearson chi-square test of the binned observations against the fit's cdf
+
+    The bins are about equiprobable under the fit (2*n^0.4 of them by
+    default), their edges moved onto the edges of the rounding intervals
+    when there is a resolution, and neighbouring bins are merged until
+    each expects min_expected observations.  The degrees of freedom are
+    the bins less one less the fitted parameters.
+    """
+    x = np.sort(np.asarray(x, dtype=float))
+    n = len(x)
+    distribution = fit.distribution()
+    bins = bins or max(3, int(2*n**0.4))
+    edges = distribution.ppf(np.arange(1, bins)/bins)
+    if resolution:
+        edges = (np.floor(edges/resolution - 0.5) + 0.5)*resolution
+        edges = edges[edges > 0]
+    edges = np.unique(edges)
+
+    observed = np.diff(np.concatenate(([0], np.searchsorted(x, edges), [n])))
+    expected = n*np.diff(distribution.cdf(np.concatenate(([-np.inf], edges, [np.inf]))))
+
+    # merge bins from the left until each expects min_expected
+    merged_observed, merged_expected = [], []
+    o = e = 0.0
+    for oi, ei in zip(observed, expected):
+        o += oi
+        e += ei
+        if e >= min_expected:
+            merged_observed.append(o)
+            merged_expected.append(e)
+            o = e = 0.0
+    if e > 0 or o > 0:
+        if merged_expected:
+            merged_observed[-1] += o
+            merged_expected[-1] += e
+        else:
+            merged_observed.append(o)
+            merged_expected.append(e)
+    observed = np.array(merged_observed)
+    expected = np.array(merged_expected)
+
+    statistic = float(np.sum((observed - expected)**2/expected))
+    df = len(observed) - 1 - len(fit.params)
+    p = float(stats.chi2.sf(statistic, df)) if df > 0 else math.nan
+    return {"chi2": statistic, "chi2_df": df, "chi2_p": p}
+
+
+def _ecdf_steps(x, fit, resolution):
+    """fit cdf and empirical cdf at the edges where the empirical cdf steps
+
+    Returns (F, before, after): the fit's cdf at the lower and upper edge of
+    each distinct value's interval, and the empirical cdf just below and at
+    the value.
+    """
+    x = np.asarray(x, dtype=float)
+    distribution = fit.distribution()
+    values, counts, lower, upper = _cells(x, resolution or 0)
+    after = np.cumsum(counts)/len(x)
+    before = after - counts/len(x)
+    return distribution.cdf(lower), distribution.cdf(upper), before, after
+
+
+def kolmogorov_smirnov(x, fit, resolution=None):
+    """Kolmogorov-Smirnov distance between the observations and the fit's cdf
+
+    The p-value is that of a fully specified distribution, so it is
+    conservative for fitted parameters (and for rounded data).
+    """
+    F_lower, F_upper, before, after = _ecdf_steps(x, fit, resolution)
+    D = float(max(np.max(np.abs(after - F_upper)), np.max(np.abs(before - F_lower))))
+    return {"ks": D, "ks_p": float(stats.kstwo.sf(D, len(x)))}
+
+
+def _ad_integral(F, S, counts):
+    """n times the integral of (Fn - F)^2/(F(1 - F)) dF for an empirical cdf Fn
+
+    F and S = 1 - F are the fitted cdf and survival function at the steps
+    of Fn (increasing), and counts the observations at each step.  Between
+    steps Fn is a constant e, and over a stretch where F goes from a to b
+    the integral is e^2 log(b/a) + (1 - e)^2 log((1 - a)/(1 - b)) - (b - a).
+    """
+    n = counts.sum()
+    F = np.clip(F, 1e-300, 1)
+    S = np.clip(S, 1e-300, 1)
+    e = np.concatenate(([0], np.cumsum(counts)/n))
+    a, b = np.concatenate(([0], F)), np.concatenate((F, [1]))
+    sa, sb = np.concatenate(([1], S)), np.concatenate((S, [1e-300]))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        lower = np.where(e > 0, e**2*np.log(b/a), 0)
+        upper = np.where(e < 1, (1 - e)**2*np.log(sa/sb), 0)
+    return float(n*np.sum(lower + upper - (b - a)))
+
+
+def anderson_darling(x, fit, resolution=None):
+    """Anderson-Darling statistic of the observations against the fit's cdf
+
+    The statistic is the integral of (Fn - F)^2/(F(1 - F)) dF, taken in
+    closed form between the steps of the empirical cdf Fn; for exact data
+    this is the usual formula.  For rounded data the observations of each
+    interval step at the middle of the interval's fitted probability.  No
+    p-value: its distribution depends on the family and the fitted
+    parameters.
+    """
+    x = np.asarray(x, dtype=float)
+    distribution = fit.distribution()
+    values, counts, lower, upper = _cells(x, resolution or 0)
+    if not resolution:
+        F, S = distribution.cdf(values), distribution.sf(values)
+    else:
+        F = (distribution.cdf(lower) + distribution.cdf(upper))/2
+        S = (distribution.sf(lower) + distribution.sf(upper))/2
+    return {"ad": _ad_integral(F, S, counts)}
+
+
+def goodness_of_fit(x, fit, resolution=None, bins=None):
+    """chi-square, Kolmogorov-Smirnov and Anderson-Darling results as one dict"""
+    results = chi_square(x, fit, bins, resolution)
+    results.update(kolmogorov_smirnov(x, fit, resolution))
+    results.update(anderson_darling(x, fit, resolution))
+    return results
+
+
+def fit_table(x, families=tuple(FAMILIES), resolution=None, bins=None):
+    """one row per family: the fit, its likelihood criteria and tests, best first"""
+    rows = []
+    for f in fit_families(x, families, resolution):
+        row = {"family": f.family.name, "fit": f.describe(), "mean": f.mean(),
+               "loglik": f.loglik, "aic": f.aic(), "bic": f.bic()}
+        row.update(goodness_of_fit(x, f, resolution, bins))
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def best_fit(x, families=tuple(FAMILIES), resolution=None):
+    """the Fit with the lowest AIC"""
+    return fit_families(x, families, resolution)[0]
+
+
+def main(argv=None):
+    from Data_loading import DEFAULT_PATH, load_data
+    p = argparse.ArgumentParser(description="Fit distributions to the observed times.")
+    p.add_argument("--data", default=DEFAULT_PATH, help="observations csv file")
+    # Interarrival_sec leaves out the gaps between sessions (see Data_loading)
+    p.add_argument("--column", nargs="+", default=["Interarrival_sec", "Serv_time_sec"])
+    p.add_argument("--families", nargs="+", default=list(FAMILIES), choices=list(FAMILIES))
+    p.add_argument("--resolution", type=float, default=1,
+                   help="rounding of the recorded times in s (0: exact)")
+    p.add_argument("--bins", type=int, help="chi-square bins (default 2*n^0.4)")
+    args = p.parse_args(argv)
+
+    data = load_data(args.data)
+    tables = {}
+    for column in args.column:
+        tables[column] = fit_table(data[column].dropna(), args.families,
+                                   args.resolution or None, args.bins)
+        print("\n%s (n = %d)" % (column, data[column].notna().sum()))
+        with pd.option_context("display.width", 200, "display.max_columns", 20,
+                               "display.float_format", "{:.4g}".format):
+            print(tables[column].to_string(index=False))
+    return tables
+
+
+if __name__ == "__main__":
+    main()
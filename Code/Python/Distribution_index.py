@@ -0,0 +1,68 @@
+##############################
+#
+# Queueing system in action
+# Bueno, G and Kakau, C
+#
+##############################
+
+# empirical inter-arrival and service distributions for every session,
+# server count and lane in the observations, built once up front.
+#
+# Inter-arrival times are only taken between arrivals of the same session,
+# so there are no gaps spanning two sessions (or two days), and lane-level
+# inter-arrival times are gaps between arrivals at that lane.  Any of the
+# three keys may be left out (None) to pool over it, so for example
+# index.get(servers=3) gives the distributions of all 3-server sessions.
+
+
+# import libraries
+
+import itertools
+from Empirical_distribution import EmpiricalDistribution
+from Data_loading import interarrival_times
+
+
+KEYS = ("Session", "Servers", "Lane")
+
+
+class DistributionIndex:
+    """prebuilt inter-arrival and service samplers keyed by (session, servers, lane)
+
+    data is the observation table of load_data(), or any table with columns
+    Session, Servers, Lane, Serv_time_sec and the arrival date-times.
+    """
+
+    def __init__(self, data):
+        data = data.reset_index(drop=True)
+        self.samplers = {}
+        self.counts = {}
+
+        for use in itertools.product((True, False), repeat=3):
+            keys = [k for k, u in zip(KEYS, use) if u]
+            # gaps always stay within a session, and within a lane when
+            # the lane is part of the key
+            gaps = interarrival_times(data, ["Session", "Lane"] if use[2] else ["Session"])
+            groups = data.groupby(keys) if keys else [((), data)]
+            for values, group in groups:
+                values = values if isinstance(values, tuple) else (values,)
+                values = iter(values)
+                key = tuple(next(values) if u else None for u in use)
+                group_gaps = gaps.loc[group.index].dropna()
+                if len(group_gaps) == 0:
+                    continue
+                self.samplers[key] = (EmpiricalDistribution(group_gaps),
+                                      EmpiricalDistribution(group["Serv_time_sec"]))
+                self.counts[key] = (len(group_gaps), len(group))
+
+    def get(self, session=None, servers=None, lane=None):
+        """(inter-arrival, service) EmpiricalDistributions; None pools over that key"""
+        key = (session, servers, lane)
+        if key not in self.samplers:
+            raise KeyError("no observations for session=%r, servers=%r, lane=%r" % key)
+        return self.samplers[key]
+
+    def keys(self):
+        return list(self.samplers)
+
+    def __contains__(self, key):
+        return tuple(key) in self.samplers
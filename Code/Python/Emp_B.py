@@ -11,13 +11,13 @@
 
 # import libraries
 
-from SimPy.Simulation import *
 import random
 import numpy as np
 import math
 import pandas as pd
 import statsmodels.distributions.empirical_distribution as st
 import matplotlib.pyplot as plt
+from Run_experiment import experiment_params, load_results, theoretic_measures
 
 ## confidence intervals
 
@@ -30,10 +30,22 @@ def conf(L):
 
 
 ##################################################
+
+
 ######## Plot performance measures against baseline estimates ######
 
-plt.plot(allB3, color = "orange", label = "simulated") # average utilisation rate
-plt.axhline(0.3699, color = "orangered", label = "theoretic", ls = "--")
-plt.title("Average utilisation: Empirical model")
-plt.legend()
-plt.show()
+if __name__ == "__main__":
+
+    # theoretic G/G/4 measures (Allen-Cunneen) for the observed inter-arrival
+    # and service times of the simulation
+    theory = theoretic_measures("model3")
+
+    # simulated measures of the report's experiments (the defaults of
+    # Run_experiment.py)
+    allB3 = load_results("model3", **experiment_params("model3"))["B"]
+
+    plt.plot(allB3, color = "orange", label = "simulated") # average utilisation rate
+    plt.axhline(theory["rho"], color = "orangered", label = "theoretic", ls = "--")
+    plt.title("Average utilisation: Empirical model")
+    plt.legend()
+    plt.show()
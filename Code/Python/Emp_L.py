@@ -11,13 +11,13 @@
 
 # import libraries
 
-from SimPy.Simulation import *
 import random
 import numpy as np
 import math
 import pandas as pd
 import statsmodels.distributions.empirical_distribution as st
 import matplotlib.pyplot as plt
+from Run_experiment import experiment_params, load_results, theoretic_measures
 
 ## confidence intervals
 
@@ -30,12 +30,22 @@ def conf(L):
 
 
 ##################################################
+
+
 ######## Plot performance measures against baseline estimates ######
 
+if __name__ == "__main__":
+
+    # theoretic G/G/4 measures (Allen-Cunneen) for the observed inter-arrival
+    # and service times of the simulation
+    theory = theoretic_measures("model3")
 
-plt.plot(allL3, color = "darkblue", label = "simulated") # average number of customers in system
-plt.axhline(1.663, color = "blue", label = "theoretic", ls = "--")
-plt.title("Average number of customers: Empirical model")
-plt.legend()
-plt.show()
+    # simulated measures of the report's experiments (the defaults of
+    # Run_experiment.py)
+    allL3 = load_results("model3", **experiment_params("model3"))["L"]
 
+    plt.plot(allL3, color = "darkblue", label = "simulated") # average number of customers in system
+    plt.axhline(theory["L"], color = "blue", label = "theoretic", ls = "--")
+    plt.title("Average number of customers: Empirical model")
+    plt.legend()
+    plt.show()
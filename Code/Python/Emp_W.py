@@ -11,13 +11,13 @@
 
 # import libraries
 
-from SimPy.Simulation import *
 import random
 import numpy as np
 import math
 import pandas as pd
 import statsmodels.distributions.empirical_distribution as st
 import matplotlib.pyplot as plt
+from Run_experiment import experiment_params, load_results, theoretic_measures
 
 ## confidence intervals
 
@@ -30,12 +30,22 @@ def conf(L):
 
 
 ##################################################
+
+
 ######## Plot performance measures against baseline estimates ######
 
+if __name__ == "__main__":
+
+    # theoretic G/G/4 measures (Allen-Cunneen) for the observed inter-arrival
+    # and service times of the simulation
+    theory = theoretic_measures("model3")
 
-plt.plot(allW3, color = "green", label = "simulated") # average time in the system
-plt.axhline(38.2559, color = "lime", label = "theoretic", ls = "--")
-plt.title("Average time (s) in the system: Empirical model")
-plt.legend()
-plt.show()
+    # simulated measures of the report's experiments (the defaults of
+    # Run_experiment.py)
+    allW3 = load_results("model3", **experiment_params("model3"))["W"]
 
+    plt.plot(allW3, color = "green", label = "simulated") # average time in the system
+    plt.axhline(theory["W"], color = "lime", label = "theoretic", ls = "--")
+    plt.title("Average time (s) in the system: Empirical model")
+    plt.legend()
+    plt.show()
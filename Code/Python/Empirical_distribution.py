@@ -0,0 +1,76 @@
+##############################
+#
+# Queueing system in action
+# Bueno, G and Kakau, C
+#
+##############################
+
+# empirical distribution sampler for the observed inter-arrival and service times.
+# The ecdf table is built once from the observations and then sampled by
+# binary search, rather than being rebuilt on every draw as draw_empirical() does.
+
+
+# import libraries
+
+from bisect import bisect_left
+import numpy as np
+
+
+class EmpiricalDistribution:
+    """inverse-cdf sampler for the empirical cdf of data"""
+
+    def __init__(self, data):
+        data = np.asarray(data)
+        if len(data) == 0:
+            raise ValueError("cannot build an empirical distribution from no data")
+
+        # sorted support and cumulative table, as in draw_empirical():
+        # both start at 0 so the first step interpolates from the origin
+        obs_values, freq = np.unique(data, return_counts=True)
+        empf = freq*1.0/len(data)
+        self.obs_values = np.concatenate(([0], obs_values)).astype(float)
+        self.ecum = np.concatenate(([0], np.cumsum(empf)))
+        self.n = len(data)
+        # plain lists for single draws, which are cheaper to search with
+        # bisect than to pass through numpy one at a time
+        self._values = self.obs_values.tolist()
+        self._ecum = self.ecum.tolist()
+
+    def draw(self, r):
+        """one draw (for given r ~ U(0,1)) from the empirical cdf"""
+        # the same arithmetic as ppf(), on Python floats
+        ecum, values = self._ecum, self._values
+        k = min(max(bisect_left(ecum, r), 1), len(ecum) - 1)
+        upper = values[k]
+        lower = values[k - 1]
+        return upper - 1.0*(ecum[k] - r)*(upper - lower)/(ecum[k] - ecum[k - 1])
+
+    def ppf(self, r):
+        """inverse of the empirical cdf, linear between the observed values"""
+        r = np.asarray(r, dtype=float)
+        # first ecum >= r; clipped so that r = 0 and rounding in the last
+        # cumulative value both stay inside the table
+        r_end = np.clip(np.searchsorted(self.ecum, r, side="left"), 1, len(self.ecum) - 1)
+        upper = self.obs_values[r_end]
+        lower = self.obs_values[r_end - 1]
+        y = upper - 1.0*(self.ecum[r_end] - r)*(upper - lower)/(self.ecum[r_end] - self.ecum[r_end - 1])
+        return y
+
+    def sample(self, n, rng=None):
+        """n draws from the empirical cdf, using rng (default: numpy's global state)"""
+        if rng is None:
+            u = np.random.random(n)
+        else:
+            u = rng.random(n)
+        return self.ppf(u)
+
+    def mean(self):
+        """mean of the interpolated empirical distribution"""
+        # between consecutive support points the cdf is linear, so each step
+        # contributes the midpoint times its probability
+        p = np.diff(self.ecum)
+        mids = (self.obs_values[1:] + self.obs_values[:-1])/2.0
+        return float(np.sum(p*mids))
+
+    def __len__(self):
+        return self.n
@@ -0,0 +1,144 @@
+##############################
+#
+# Queueing system in action
+# Bueno, G and Kakau, C
+#
+##############################
+
+# a small discrete-event kernel to replace the legacy SimPy 2 package.
+#
+# Processes are generator functions, as in the modern simpy.Environment API:
+#
+#   def customer(env, server):
+#       yield server.request()     # wait for a free server (FIFO)
+#       yield env.timeout(t)       # hold for t
+#       server.release()           # hand the server to the next in line
+#
+#   env = Environment()
+#   env.process(customer(env, Resource(env, 4)))
+#   env.run(until=maxtime)
+#
+# All state lives in the Environment, so any number of simulations can run in
+# one process.  Events are ordered exactly as in SimPy 2: by time, then in the
+# order they were scheduled, except that a process granted a server at
+# release goes before the other events at that time.  Runs therefore give the
+# same results as the SimPy 2 models did.  The end of a run is also the
+# same: at until if events remain, otherwise at the last event.
+#
+# For the tools written against SimPy 2 (StreamingMonitor, Instrument) the
+# Environment keeps its names now(), simulate(until), _post() and
+# _timestamps.
+
+
+# import libraries
+
+from collections import deque
+from heapq import heappush, heappop
+
+
+class Timeout:
+    """hold the yielding process for delay"""
+    __slots__ = ("delay",)
+
+    def __init__(self, delay):
+        if delay < 0:
+            raise ValueError("timeout: negative delay %s" % delay)
+        self.delay = delay
+
+
+class Request:
+    """wait for a unit of resource"""
+    __slots__ = ("resource",)
+
+    def __init__(self, resource):
+        self.resource = resource
+
+
+class Resource:
+    """capacity identical servers with one FIFO queue"""
+
+    def __init__(self, env, capacity=1):
+        if capacity < 0:
+            raise ValueError("capacity should be >= 0, but is: %s" % capacity)
+        self.env = env
+        self.capacity = capacity
+        self.free = capacity
+        self.waitQ = deque()
+
+    def request(self):
+        return Request(self)
+
+    def release(self):
+        """free a unit; the first waiting process gets it and resumes at once"""
+        if self.waitQ:
+            self.env._post(self.waitQ.popleft(), self.env._t, prior=True)
+        else:
+            self.free += 1
+
+    @property
+    def count(self):
+        """units in use"""
+        return self.capacity - self.free
+
+
+class Environment:
+    """event list and clock of one simulation"""
+
+    def __init__(self, initial_time=0):
+        self._t = initial_time
+        self._timestamps = []
+        self._sortpr = 0
+
+    def now(self):
+        return self._t
+
+    def _post(self, process, at, prior=False):
+        """schedule process to resume at time at"""
+        if at < self._t:
+            raise ValueError("attempt to schedule an event in the past")
+        # FIFO among events at the same time; prior events go before all
+        # others at their time, the latest first (as in SimPy 2)
+        self._sortpr -= 1
+        heappush(self._timestamps, (at, self._sortpr if prior else -self._sortpr, process))
+
+    def process(self, generator):
+        """start a process now"""
+        self._post(generator, self._t)
+        return generator
+
+    def timeout(self, delay):
+        return Timeout(delay)
+
+    def _resume(self, process):
+        """run process up to its next wait"""
+        while True:
+            try:
+                command = next(process)
+            except StopIteration:
+                return
+            if type(command) is Timeout:
+                self._post(process, self._t + command.delay)
+                return
+            if type(command) is Request:
+                resource = command.resource
+                if resource.free > 0:
+                    resource.free -= 1
+                    continue  # served at once
+                resource.waitQ.append(process)
+                return
+            raise TypeError("a process must yield a timeout or a request, not %r" % (command,))
+
+    def run(self, until):
+        """process all events up to time until"""
+        timestamps = self._timestamps
+        resume = self._resume
+        while timestamps and timestamps[0][0] <= until:
+            self._t, priority, process = heappop(timestamps)
+            resume(process)
+        if timestamps:
+            # events left: the run ends at until
+            self._t = until
+
+    def simulate(self, until):
+        """run(until), under its SimPy 2 name"""
+        self.run(until)
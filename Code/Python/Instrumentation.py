@@ -0,0 +1,121 @@
+##############################
+#
+# Queueing system in action
+# Bueno, G and Kakau, C
+#
+##############################
+
+# optional instrumentation of one event-driven replication.
+#
+# model(..., instrument=True) (and model2, model3) wraps the replication in
+# an Instrument, which counts the events scheduled and the peaks of the event
+# list, the queue and the number in system, and splits the wall-clock time
+# into sampling (the interarrival and service draws), monitoring (the
+# observe() calls) and scheduling (everything else in simulate()).
+#
+# Nothing in the Source and Arrival processes is changed: the Instrument
+# replaces the draw functions, the monitors' observe() and the simulation's
+# _post() of the one replication (a Queue_model.Run) with counting wrappers,
+# so a replication without it runs exactly the code it always did.
+
+
+# import libraries
+
+import time
+
+
+class Instrument:
+    """counters and timers of one replication
+
+    run holds the replication's environment (sim), server, monitors
+    (delaymon, numbermon, busymon) and draw functions (interarrival,
+    service), as Queue_model.Run.
+    """
+
+    def __init__(self, run, sim=None):
+        self.sim = run.sim if sim is None else sim
+        self.run = run
+        self.events = 0
+        self.peak_event_list = 0
+        self.peak_queue = 0
+        self.peak_in_system = 0
+        self.draws = 0
+        self.observations = 0
+        self.sampling = 0.0
+        self.monitoring = 0.0
+        self.wall = 0.0
+        self.simulated = 0.0
+        self._attach()
+
+    def _attach(self):
+        run = self.run
+        run.interarrival = self._sampler(run.interarrival)
+        run.service = self._sampler(run.service)
+        for name in ("delaymon", "numbermon", "busymon"):
+            self._monitor(getattr(run, name), in_system=(name == "numbermon"))
+
+        # every event notice goes through the simulation's _post()
+        post = self.sim._post
+        timestamps = self.sim._timestamps
+        def counted_post(what, at, prior=False):
+            self.events += 1
+            post(what, at, prior)
+            if len(timestamps) > self.peak_event_list:
+                self.peak_event_list = len(timestamps)
+        self.sim._post = counted_post
+
+    def _sampler(self, draw):
+        clock = time.perf_counter
+        def timed_draw():
+            start = clock()
+            value = draw()
+            self.sampling += clock() - start
+            self.draws += 1
+            return value
+        return timed_draw
+
+    def _monitor(self, monitor, in_system=False):
+        clock = time.perf_counter
+        observe = monitor.observe
+        queue = self.run.server.waitQ
+        def timed_observe(y, t=None):
+            start = clock()
+            observe(y, t)
+            self.monitoring += clock() - start
+            self.observations += 1
+            if len(queue) > self.peak_queue:
+                self.peak_queue = len(queue)
+            if in_system and y > self.peak_in_system:
+                self.peak_in_system = y
+        monitor.observe = timed_observe
+
+    def detach(self):
+        """restore the simulation's own _post()"""
+        self.sim.__dict__.pop("_post", None)
+
+    def simulate(self, until):
+        """run simulate(until) with the instrumentation, then detach it"""
+        start = time.perf_counter()
+        try:
+            self.sim.simulate(until=until)
+        finally:
+            self.wall = time.perf_counter() - start
+            self.simulated = self.sim.now()
+            self.detach()
+
+    def report(self):
+        """counters and timings of the replication as a dict"""
+        hours = self.simulated/3600
+        return {"events": self.events,
+                "events_per_second": self.events/self.wall if self.wall else 0.0,
+                "peak_event_list": self.peak_event_list,
+                "peak_queue": self.peak_queue,
+                "peak_in_system": self.peak_in_system,
+                "draws": self.draws,
+                "observations": self.observations,
+                "sampling_s": self.sampling,
+                "monitoring_s": self.monitoring,
+                "scheduling_s": self.wall - self.sampling - self.monitoring,
+                "wall_s": self.wall,
+                "simulated_time": self.simulated,
+                "wall_per_simulated_hour": self.wall/hours if hours else 0.0}
@@ -0,0 +1,152 @@
+##############################
+#
+# Queueing system in action
+# Bueno, G and Kakau, C
+#
+##############################
+
+# array engine for the FCFS c-server queue used by model(), model2() and model3().
+# Instead of one SimPy process per customer, the inter-arrival and service
+# times are drawn up front and pushed through the Kiefer-Wolfowitz recursion:
+# customer i starts service at max(arrival, earliest time a server is free),
+# and the c server-free times are kept in a heap.  The performance measures
+# are then read off the arrival and departure arrays with NumPy.
+
+
+# import libraries
+
+import heapq
+import numpy as np
+from Occupancy import occupancy_times
+
+
+def kiefer_wolfowitz(interarrivals, services, c):
+    """arrival, service start and departure times of a FCFS c-server queue
+
+    interarrivals[i] is the gap after customer i arrives (as in Source.run,
+    the first customer arrives at time 0) and services[i] is the service time
+    of customer i.
+    """
+    interarrivals = np.asarray(interarrivals, dtype=float)
+    services = np.asarray(services, dtype=float)
+    N = len(services)
+
+    arrivals = np.zeros(N)
+    np.cumsum(interarrivals[:N - 1], out=arrivals[1:])
+
+    # workload vector: times at which each of the c servers is next free
+    free = [0.0]*c
+    starts = []
+    for a, s in zip(arrivals.tolist(), services.tolist()):
+        start = max(a, free[0])
+        heapq.heapreplace(free, start + s)
+        starts.append(start)
+
+    starts = np.array(starts)
+    return arrivals, starts, starts + services
+
+
+def kiefer_wolfowitz_batch(interarrivals, services, c):
+    """kiefer_wolfowitz() for many replications at once
+
+    interarrivals and services are (reps x N) arrays, one row per
+    replication.  All replications are advanced customer by customer in
+    lockstep, so the Python loop runs N times whatever the number of reps.
+    """
+    interarrivals = np.asarray(interarrivals, dtype=float)
+    services = np.asarray(services, dtype=float)
+    reps, N = services.shape
+
+    arrivals = np.zeros((reps, N))
+    np.cumsum(interarrivals[:, :N - 1], axis=1, out=arrivals[:, 1:])
+
+    # one workload vector per replication; the next customer takes the
+    # earliest free server
+    free = np.zeros((reps, c))
+    starts = np.empty((reps, N))
+    rows = np.arange(reps)
+    for i in range(N):
+        k = free.argmin(axis=1)
+        start = np.maximum(arrivals[:, i], free[rows, k])
+        free[rows, k] = start + services[:, i]
+        starts[:, i] = start
+
+    return arrivals, starts, starts + services
+
+
+def queue_measures(arrivals, departures, maxtime, source_end, busy="servers", c=None,
+                   occupancy=None):
+    """(W, L, B) as the monitors of the event-kernel models report them
+
+    W is the mean time in system of customers that left by maxtime, L the
+    time-average number in system and B the per-server utilisation, the
+    time-average of min(n, c)/c (busy="servers", all models; c is then
+    needed).  The old busy indicator (system non-empty) is still available,
+    time-averaged (busy="time") or averaged over arrival and departure
+    events (busy="mean").  As in SimPy, the run ends at maxtime, or at the
+    last event if the queue empties before then; source_end is the time of
+    the source's last hold.  occupancy, an Occupancy, if given, gets the
+    time spent with each number of busy servers (one replication only).
+
+    arrivals and departures may also be (reps x N) arrays, in which case W,
+    L and B are arrays with one value per replication.
+    """
+    arrivals = np.asarray(arrivals, dtype=float)
+    departures = np.asarray(departures, dtype=float)
+
+    left = departures <= maxtime
+    with np.errstate(invalid="ignore"):
+        W = np.sum(np.where(left, departures - arrivals, 0), axis=-1)/np.sum(left, axis=-1)
+
+    end = np.minimum(maxtime, np.maximum(source_end, departures.max(axis=-1)))
+    end_ = end[..., np.newaxis]
+    L = np.sum(np.clip(np.minimum(departures, end_) - arrivals, 0, None), axis=-1)/end
+
+    # number in system after each arrival (+1) and departure (-1); events
+    # after maxtime are never seen, and clipping them to the end time gives
+    # them no weight in the time average
+    times = np.concatenate((arrivals, departures), axis=-1)
+    steps = np.concatenate((np.ones(arrivals.shape), -np.ones(departures.shape)), axis=-1)
+    order = np.argsort(times, axis=-1, kind="stable")
+    times = np.take_along_axis(times, order, axis=-1)
+    n = np.cumsum(np.take_along_axis(steps, order, axis=-1), axis=-1)
+    seen = times <= maxtime
+
+    durations = np.diff(np.minimum(times, end_), axis=-1, append=end_)
+    if occupancy is not None:
+        occupancy.add(occupancy_times(n, durations, occupancy.c))
+    if busy == "servers":
+        if c is None:
+            raise ValueError("busy='servers' needs the number of servers c")
+        B = np.sum(np.minimum(n, c)*durations, axis=-1)/(c*end)
+    elif busy == "mean":
+        B = np.sum(seen & (n > 0), axis=-1)/np.sum(seen, axis=-1)
+    elif busy == "time":
+        B = np.sum(np.where(n > 0, durations, 0), axis=-1)/end
+    else:
+        raise ValueError("busy must be 'servers', 'time' or 'mean', not %r" % (busy,))
+    return (W, L, B)
+
+
+def simulate_replications(interarrivals, services, c, maxtime, busy="servers"):
+    """per-replication (W, L, B) arrays for (reps x N) inter-arrival and service times"""
+    interarrivals = np.asarray(interarrivals, dtype=float)
+    arrivals, starts, departures = kiefer_wolfowitz_batch(interarrivals, services, c)
+    source_end = arrivals[:, -1] + interarrivals[:, arrivals.shape[1] - 1]
+    return queue_measures(arrivals, departures, maxtime, source_end, busy, c)
+
+
+def simulate_fcfs(interarrivals, services, c, maxtime, busy="servers", delays=None,
+                  occupancy=None):
+    """(W, L, B) of a FCFS c-server queue fed with the given inter-arrival and service times
+
+    delays, a Delay_sketch.Delays, if given, gets the wait and sojourn time
+    of every customer that left by maxtime, and occupancy, an Occupancy,
+    the time spent with each number of busy servers.
+    """
+    arrivals, starts, departures = kiefer_wolfowitz(interarrivals, services, c)
+    source_end = arrivals[-1] + interarrivals[len(arrivals) - 1]
+    if delays is not None:
+        left = departures <= maxtime
+        delays.observe_many((starts - arrivals)[left], (departures - arrivals)[left])
+    return queue_measures(arrivals, departures, maxtime, source_end, busy, c, occupancy)
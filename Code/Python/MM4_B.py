@@ -11,19 +11,28 @@
 
 # import libraries
 
-from SimPy.Simulation import *
 import random
 import numpy as np
 import math
 import pandas as pd
 import statsmodels.distributions.empirical_distribution as st
 import matplotlib.pyplot as plt
+from Queueing_theory import mmc
+from Run_experiment import experiment_params, load_results
 
 
 ######## Plot performance measures against baseline estimates ######
 
-plt.plot(allB, color = "orange", label = "simulated") # average utilisation rate
-plt.axhline(0.3699, color = "orangered", label = "theoretic", ls = "--")
-plt.title("Average utilisation: M/M/4")
-plt.legend()
-plt.show()
+if __name__ == "__main__":
+
+    # simulated measures of the report's experiment (the defaults of
+    # Run_experiment.py) and the theoretic M/M/c measures for its parameters
+    params = experiment_params("model")
+    allB = load_results("model", **params)["B"]
+    theory = mmc(lamb=params["lamb"], mu=params["mu"], c=params["c"])
+
+    plt.plot(allB, color = "orange", label = "simulated") # average utilisation rate
+    plt.axhline(theory["rho"], color = "orangered", label = "theoretic", ls = "--")
+    plt.title("Average utilisation: M/M/4")
+    plt.legend()
+    plt.show()
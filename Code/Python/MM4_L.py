@@ -11,20 +11,28 @@
 
 # import libraries
 
-from SimPy.Simulation import *
 import random
 import numpy as np
 import math
 import pandas as pd
 import statsmodels.distributions.empirical_distribution as st
 import matplotlib.pyplot as plt
+from Queueing_theory import mmc
+from Run_experiment import experiment_params, load_results
 
 
 ######## Plot performance measures against baseline estimates ######
 
+if __name__ == "__main__":
 
-plt.plot(allL, color = "darkblue", label = "simulated") # average number of customers in system
-plt.axhline(1.663, color = "blue", label = "theoretic", ls = "--")
-plt.title("Average number of customers: M/M/4")
-plt.legend()
-plt.show()
+    # simulated measures of the report's experiment (the defaults of
+    # Run_experiment.py) and the theoretic M/M/c measures for its parameters
+    params = experiment_params("model")
+    allL = load_results("model", **params)["L"]
+    theory = mmc(lamb=params["lamb"], mu=params["mu"], c=params["c"])
+
+    plt.plot(allL, color = "darkblue", label = "simulated") # average number of customers in system
+    plt.axhline(theory["L"], color = "blue", label = "theoretic", ls = "--")
+    plt.title("Average number of customers: M/M/4")
+    plt.legend()
+    plt.show()
@@ -11,7 +11,7 @@
 
 # import libraries
 
-from SimPy.Simulation import *
+from Queue_model import queue_model
 import random
 import numpy as np
 import math
@@ -32,147 +32,27 @@ def conf(L):
 ##################################################
 
 
-# read in data
-# read in empirical data,
-# read in raw data
-# script in the same directory as datafile
-
-raw_data = pd.read_csv("DATA474_Proj_data.csv", 
-                      parse_dates =[
-                          ["Date", "Arrive"],
-                          ["Date", "Serv_start"],
-                          ["Date", "Serv_end"]
-                      ])
-
-# extract and store inter-arrival times for use with the draw_empirical function
-arr_data = []
-for i in range(len(raw_data["Date_Arrive"])):
-    if i == 0:
-        arr_data.append(0)
-    else:
-        inter = (raw_data.loc[i, "Date_Arrive"] - raw_data.loc[i-1,"Date_Arrive"]).seconds
-        arr_data.append(inter)
-        
-# store the serving time data for use with the draw_empirical() function
-serv_data = raw_data.loc[:,"Serv_time_sec"]
-
-
-
 ###### M/M/4 model ############################
 
-# Model
-class Source(Process):
-    """generate random arrivals"""
-    def run(self, N, lamb, mu):
-        for i in range(N):
-            a = Arrival(str(i))
-            activate(a, a.run(mu))
-            t = random.expovariate(lamb)
-            yield hold, self, t
-
-
-class Arrival(Process):
-    """an arrival"""
-    n = 0 # class variable (number in system)
-    
-    def run(self, mu):
-        # Event: arrival
-        Arrival.n += 1 # number in system
-        arrivetime = now()
-        G.numbermon.observe(Arrival.n)
-        if (Arrival.n>0):
-            G.busymon.observe(1)
-        else:
-            G.busymon.observe(0)
-        
-        yield request, self, G.server
-        # ... waiting in queue for server to be empty (delay) ...
-
-        # Event: service begins
-        t = random.expovariate(mu)
-        
-        yield hold, self, t
-        # ... now being served (activity) ...
-        
-        # Event: service ends
-        yield release, self, G.server 
-        
-        Arrival.n-=1
-        G.numbermon.observe(Arrival.n)
-        if (Arrival.n>0):
-            G.busymon.observe(1)
-        else:
-            G.busymon.observe(0)
-        delay = now()-arrivetime
-        G.delaymon.observe(delay)
-
-
-class G:
-    server = 'dummy'
-    delaymon = 'Monitor'
-    numbermon = 'Monitor'
-    busymon = 'Monitor'
-
-
-def model(c, N, lamb, mu, maxtime, rvseed):
-    # setup
-    initialize()
-    random.seed(rvseed)
-    G.server = Resource(c, monitored = True)
-    G.delaymon = Monitor()
-    G.numbermon = Monitor()
-    G.busymon = Monitor()
-  
-    Arrival.n = 0
-    
-    # simulate
-    s = Source('Source')
-    activate(s, s.run(N, lamb, mu))
-    simulate(until=maxtime)
-
-    # gather performance measures
-    W = G.delaymon.mean()
-    L = G.numbermon.timeAverage()
-    B = G.busymon.mean()
-    return(W,L,B)
+# Model: exponential inter-arrival and service times, B the per-server
+# utilisation as in all models (see Queue_model and Occupancy)
+def model(c, N, lamb, mu, maxtime, rvseed, engine="simpy", streams="legacy", instrument=False,
+          delays=False, occupancy=False):
+    # random variates: streams="legacy" seeds the global random module with
+    # rvseed; "crn" and "independent" draw by inversion from separate arrival
+    # and service streams (see Random_streams)
+    queue = queue_model("model", c, lamb=lamb, mu=mu)
+    return queue.run(N, maxtime, rvseed, engine, streams, instrument, delays,
+                     occupancy)
 
 
 ## Experiment ----------------
 
-# objects to hold performance measures
-allW = []
-allL= []
-allB = []
-allLambdaEffective = []
-# allBmon = []
-
-# run experiment
-for k in range(50):
-    seed = 123*k
-    result = model(c=4, N=10000, lamb=1/23.02481, mu=1/34.00496, maxtime=2000000, rvseed=seed)
-    allW.append(result[0])
-    allL.append(result[1])
-    allB.append(result[2])
-    allLambdaEffective.append(result[1]/result[0])
-#     allBmon.append(result[3])
-
-#########################################
-# estimate simulated performance measures
-
-m1_W = np.mean(allW)
-m1_L = np.mean(allL)
-m1_B = np.mean(allB)
-print("Estimate of W:", np.mean(allW))
-print("Conf in of W:", conf(allW))
-print("Estimate of L:", np.mean(allL))
-print("Conf in of L:", conf(allL))
-print("Estimate of B:", np.mean(allB))
-print("Conf int of B:", conf(allB))
-print("Estimate of LambdaEffective:", np.mean(allLambdaEffective))
-print("Conf int of LambdaEffective:", conf(allLambdaEffective))
-# print("Estimate from the Resource monitor: ", np.mean(allBmon))
-# print("Conf int of Bmon: ", conf(allBmon))
-
-
-
+# the experiment is run from the command line by Run_experiment.py, e.g.
+#   python Run_experiment.py --model model --reps 50
+# running this file does the same with the original parameters
 
+if __name__ == "__main__":
+    import sys
+    from Run_experiment import main
+    main(["--model", "model"] + sys.argv[1:])
@@ -0,0 +1,120 @@
+##############################
+#
+# Queueing system in action
+# Bueno, G and Kakau, C
+#
+##############################
+
+# server occupancy: how long 0, 1, ..., c servers are busy.
+#
+# The old busy measure B was the indicator "system non-empty", averaged over
+# events in model() and over time in model2() and model3(), so it was neither
+# the same measure across models nor the per-server utilisation rho of the
+# M/M/c formulas it was plotted against.  In a FCFS queue with c servers
+# min(n, c) servers are busy when n customers are in the system, so the
+# Occupancy below integrates that over time, in O(1) per arrival and
+# departure, and gives the per-server utilisation (now B in every model and
+# engine), the fraction of time all c servers are busy and the whole
+# distribution of the number of busy servers.  Occupancies of the same c are
+# merged by adding their times.
+
+
+# import libraries
+
+import numpy as np
+
+
+class Occupancy:
+    """time spent with k = 0, ..., c servers busy
+
+    observe(n, t) records n customers in the system from time t on, as
+    StreamingMonitor.observe(); t defaults to the current time of sim.
+    """
+
+    def __init__(self, c, sim=None):
+        self.c = c
+        self.sim = sim
+        self.times = [0.0]*(c + 1)
+        self._busy = 0
+        self._last_t = None
+
+    def observe(self, n, t=None):
+        if t is None: t = self.sim.now()
+        if self._last_t is not None:
+            self.times[self._busy] += t - self._last_t
+        self._last_t = t
+        self._busy = n if n < self.c else self.c
+
+    def close(self, t=None):
+        """count the time up to t (default: now) and detach from the simulation"""
+        if t is None: t = self.sim.now()
+        self.observe(0, t)
+        self.sim = None
+        return self
+
+    def add(self, times):
+        """add the time spent with 0, ..., c servers busy, e.g. from the array engine"""
+        for k, dt in enumerate(np.asarray(times, dtype=float).tolist()):
+            self.times[k] += dt
+        return self
+
+    def merge(self, other):
+        """add other's times (same c) to this occupancy"""
+        if other.c != self.c:
+            raise ValueError("occupancies of %d and %d servers cannot be merged"
+                             % (self.c, other.c))
+        return self.add(other.times)
+
+    def total(self):
+        return sum(self.times)
+
+    def distribution(self):
+        """fraction of the time with k = 0, ..., c servers busy"""
+        total = self.total()
+        if total == 0:
+            return None
+        return [dt/total for dt in self.times]
+
+    def utilisation(self):
+        """time-average fraction of the c servers busy (per-server utilisation)"""
+        total = self.total()
+        if total == 0:
+            return None
+        return sum(k*dt for k, dt in enumerate(self.times))/(self.c*total)
+
+    def all_busy(self):
+        """fraction of the time all c servers are busy"""
+        total = self.total()
+        if total == 0:
+            return None
+        return self.times[self.c]/total
+
+    def report(self):
+        """utilisation, P(all busy) and the occupancy distribution as a dict"""
+        report = {"utilisation": self.utilisation(), "all_busy": self.all_busy()}
+        distribution = self.distribution() or [None]*(self.c + 1)
+        for k, p in enumerate(distribution):
+            report["busy_%d" % k] = p
+        return report
+
+
+def merge(occupancies):
+    """one Occupancy of all the runs in occupancies"""
+    occupancies = list(occupancies)
+    total = Occupancy(occupancies[0].c)
+    for occupancy in occupancies:
+        total.merge(occupancy)
+    return total
+
+
+def occupancy_times(n, durations, c):
+    """time with k = 0, ..., c servers busy, from the number in system n held for durations
+
+    n and durations may be (reps x events) arrays, giving a (reps x c+1) array.
+    """
+    busy = np.minimum(n, c).astype(np.int64)
+    durations = np.asarray(durations, dtype=float)
+    if busy.ndim == 1:
+        return np.bincount(busy, weights=durations, minlength=c + 1)
+    return np.stack([np.bincount(b, weights=d, minlength=c + 1)
+                     for b, d in zip(busy, durations)])
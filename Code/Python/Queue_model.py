@@ -0,0 +1,331 @@
+##############################
+#
+# Queueing system in action
+# Bueno, G and Kakau, C
+#
+##############################
+
+# one FCFS c-server queue model for all three simulations.
+#
+# The M/M/4, best-fit and empirical models differ only in how inter-arrival
+# and service times are drawn, so QueueModel takes those as distribution
+# objects (Exponential, Gamma, Empirical, Fitted) and model(), model2() and
+# model3() are thin wrappers around it.
+#
+# Each run has its own event-kernel Environment (Event_kernel), server,
+# monitors and number-in-system counter, instead of the module-level G class and class
+# counters of the old Source/Arrival processes, so several models can run
+# at the same time in one process (threads, or interleaved runs).
+#
+# Every distribution draws in two ways:
+#   draw()    from the global random / numpy.random modules, as the original
+#             scripts did (streams="legacy");
+#   ppf(u)    by inversion of uniforms from separate arrival and service
+#             streams (streams="crn" or "independent", see Random_streams).
+# so each wrapper produces exactly the same variates as before.
+#
+# The processes take one variate at a time, but sampler() generates
+# them in blocks with one vectorized call and hands them out from a buffer.
+# A block of uniforms from a stream is the same as that many single draws,
+# so the variates do not change.  Legacy draws from the random module are
+# shared by arrivals and services in event order and stay one at a time;
+# the gamma draws of model2 have numpy.random to themselves and are blocked.
+
+
+# import libraries
+
+import random
+import numpy as np
+from Event_kernel import Environment, Resource
+from Streaming_monitor import StreamingMonitor
+from Lindley_engine import simulate_fcfs
+from Delay_sketch import Delays
+from Occupancy import Occupancy
+from Empirical_distribution import EmpiricalDistribution
+from Random_streams import model_streams, exponential_ppf, gamma_ppf
+
+
+###### distributions ############################
+
+# variates generated per block
+BLOCK = 4096
+
+
+class Buffer:
+    """one variate per call, from blocks of fill(block) variates"""
+
+    def __init__(self, fill, block=BLOCK):
+        self.fill = fill
+        self.block = block
+        self._next = iter(()).__next__
+
+    def __call__(self):
+        try:
+            return self._next()
+        except StopIteration:
+            self._next = iter(np.asarray(self.fill(self.block)).tolist()).__next__
+            return self._next()
+
+
+def sampler(distribution, rng=None, block=BLOCK):
+    """draw function of a distribution, by inversion of rng's uniforms (or legacy)"""
+    if rng is not None:
+        return Buffer(lambda n: distribution.ppf(rng.random(n)), block)
+    if distribution.own_stream:
+        return Buffer(distribution.sample, block)
+    return distribution.draw
+
+
+class Exponential:
+    """exponential times with the given rate"""
+
+    own_stream = False  # legacy draws share the random module
+
+    def __init__(self, rate):
+        self.rate = rate
+
+    def draw(self):
+        return random.expovariate(self.rate)
+
+    def sample(self, n):
+        return [self.draw() for i in range(n)]
+
+    def ppf(self, u):
+        return exponential_ppf(u, self.rate)
+
+    def mean(self):
+        return 1/self.rate
+
+
+class Gamma:
+    """gamma times with the given shape and scale (legacy draws from numpy)"""
+
+    own_stream = True
+
+    def __init__(self, shape, scale):
+        self.shape = shape
+        self.scale = scale
+
+    def draw(self):
+        return np.random.gamma(self.shape, self.scale)
+
+    def sample(self, n):
+        return np.random.gamma(self.shape, self.scale, n)
+
+    def ppf(self, u):
+        return gamma_ppf(u, self.shape, self.scale)
+
+    def mean(self):
+        return self.shape*self.scale
+
+
+class Empirical:
+    """times from the interpolated empirical cdf of observed data"""
+
+    own_stream = False
+
+    def __init__(self, data):
+        if not isinstance(data, EmpiricalDistribution):
+            data = EmpiricalDistribution(data)
+        self.distribution = data
+
+    def draw(self):
+        return self.distribution.draw(random.random())
+
+    def sample(self, n):
+        return self.distribution.ppf([random.random() for i in range(n)])
+
+    def ppf(self, u):
+        return self.distribution.ppf(u)
+
+    def mean(self):
+        return self.distribution.mean()
+
+
+class Fitted:
+    """times from a frozen scipy.stats distribution, by inversion"""
+
+    own_stream = False
+
+    def __init__(self, distribution):
+        self.distribution = distribution
+
+    def draw(self):
+        return float(self.distribution.ppf(random.random()))
+
+    def sample(self, n):
+        return self.distribution.ppf([random.random() for i in range(n)])
+
+    def ppf(self, u):
+        return self.distribution.ppf(u)
+
+    def mean(self):
+        return float(self.distribution.mean())
+
+
+###### processes ############################
+
+def source(run, N):
+    """generate random arrivals"""
+    env = run.sim
+    for i in range(N):
+        env.process(arrival(run))
+        t = run.interarrival()
+        yield env.timeout(t)
+
+
+def arrival(run):
+    """an arrival"""
+    env = run.sim
+    # Event: arrival
+    run.n += 1 # number in system
+    arrivetime = env.now()
+    run.numbermon.observe(run.n)
+    run.busymon.observe(min(run.n, run.units))
+    if run.occupancy is not None:
+        run.occupancy.observe(run.n, arrivetime)
+
+    yield run.server.request()
+    # ... waiting in queue for server to be empty (delay) ...
+
+    # Event: service begins
+    starttime = env.now()
+    t = run.service()
+
+    yield env.timeout(t)
+    # ... now being served (activity) ...
+
+    # Event: service ends
+    run.server.release()
+
+    run.n -= 1
+    run.numbermon.observe(run.n)
+    run.busymon.observe(min(run.n, run.units))
+    if run.occupancy is not None:
+        run.occupancy.observe(run.n, env.now())
+    run.delaymon.observe(env.now() - arrivetime)
+    if run.delays is not None:
+        run.delays.observe(starttime - arrivetime, env.now() - arrivetime)
+
+
+class Run:
+    """state of one replication: environment, server, monitors, counter
+
+    busymon follows min(n, units): the number of busy servers with units=c,
+    the old busy indicator (system non-empty) with units=1.
+    """
+
+    def __init__(self, c, interarrival, service, delays=None, units=None, occupancy=None):
+        self.sim = Environment()
+        self.server = Resource(self.sim, c)
+        self.units = c if units is None else units
+        self.delaymon = StreamingMonitor(sim=self.sim)
+        self.numbermon = StreamingMonitor(sim=self.sim)
+        self.busymon = StreamingMonitor(sim=self.sim)
+        self.interarrival = interarrival
+        self.service = service
+        self.delays = delays
+        self.occupancy = occupancy
+        self.n = 0
+
+
+###### model ############################
+
+class QueueModel:
+    """FCFS queue with c servers and pluggable inter-arrival and service distributions
+
+    busy is how B is measured: "servers" for the per-server utilisation
+    (time-average of min(n, c)/c, all three models), or the old measures
+    of the server-busy indicator (system non-empty), "time" for its time
+    average and "mean" for its mean over events.  name selects the model's
+    random streams (see Random_streams).
+    """
+
+    def __init__(self, c, interarrival, service, busy="servers", name="model"):
+        self.c = c
+        self.interarrival = interarrival
+        self.service = service
+        self.busy = busy
+        self.name = name
+
+    def samplers(self, rvseed, streams="legacy", block=BLOCK):
+        """draw functions of the inter-arrival and service times of one replication"""
+        if streams == "legacy":
+            random.seed(rvseed)
+            np.random.seed(rvseed)
+            return sampler(self.interarrival, block=block), sampler(self.service, block=block)
+        arrivals, services = model_streams(streams, rvseed, self.name)
+        return (sampler(self.interarrival, arrivals, block),
+                sampler(self.service, services, block))
+
+    def run(self, N, maxtime, rvseed, engine="simpy", streams="legacy", instrument=False,
+            delays=False, occupancy=False):
+        """(W, L, B) of one replication of N customers up to time maxtime
+
+        engine="simpy" runs the customers as processes on the event kernel
+        (the name is kept from the SimPy 2 models it replaces);
+        engine="lindley" draws all times up front and runs the array
+        engine.  instrument=True (event kernel only) adds the Instrument
+        report as a fourth element.  delays=True adds next a
+        Delay_sketch.Delays of the waits and sojourn times of the customers,
+        and occupancy=True, last, the Occupancy of the servers.
+        """
+        if self.busy not in ("servers", "time", "mean"):
+            raise ValueError("busy must be 'servers', 'time' or 'mean', not %r" % (self.busy,))
+        sketch = Delays() if delays else None
+        servers = Occupancy(self.c) if occupancy else None
+        extras = ((sketch,) if delays else ()) + ((servers,) if occupancy else ())
+        if engine == "lindley":
+            if instrument:
+                raise ValueError("instrument=True needs engine='simpy'")
+            if streams == "legacy":
+                random.seed(rvseed)
+                np.random.seed(rvseed)
+                interarrivals = self.interarrival.sample(N)
+                services = self.service.sample(N)
+            else:
+                arrivals, services = model_streams(streams, rvseed, self.name)
+                interarrivals = self.interarrival.ppf(arrivals.random(N))
+                services = self.service.ppf(services.random(N))
+            W, L, B = simulate_fcfs(interarrivals, services, self.c, maxtime, busy=self.busy,
+                                    delays=sketch, occupancy=servers)
+            return (W, L, B) + extras
+
+        # setup
+        run = Run(self.c, *self.samplers(rvseed, streams, min(N, BLOCK)), delays=sketch,
+                  units=self.c if self.busy == "servers" else 1, occupancy=servers)
+
+        # simulate; instrument=True also counts and times the run (see Instrumentation)
+        probe = None
+        if instrument:
+            from Instrumentation import Instrument
+            probe = Instrument(run, run.sim)
+        run.sim.process(source(run, N))
+        if probe:
+            probe.simulate(maxtime)
+        else:
+            run.sim.run(until=maxtime)
+
+        # gather performance measures
+        W = run.delaymon.mean()
+        L = run.numbermon.timeAverage()
+        if self.busy == "servers":
+            B = run.busymon.timeAverage()/self.c
+        else:
+            B = run.busymon.mean() if self.busy == "mean" else run.busymon.timeAverage()
+        if servers is not None:
+            servers.close(run.sim.now())
+        if probe:
+            extras = (probe.report(),) + extras
+        return(W,L,B) + extras
+
+
+def queue_model(model, c, lamb=None, mu=None, arr_data=None, serv_data=None):
+    """QueueModel of "model", "model2" or "model3" with that model's parameters"""
+    if model == "model":
+        return QueueModel(c, Exponential(lamb), Exponential(mu), name="model")
+    if model == "model2":
+        return QueueModel(c, Gamma(2, 2/lamb), Exponential(mu), name="model2")
+    if model == "model3":
+        return QueueModel(c, Empirical(arr_data), Empirical(serv_data), name="model3")
+    raise ValueError("unknown model %r" % (model,))
@@ -0,0 +1,103 @@
+##############################
+#
+# Queueing system in action
+# Bueno, G and Kakau, C
+#
+##############################
+
+# closed-form queueing results, used for the theoretic lines in the plots and
+# to screen staffing configurations before simulating them.
+#
+# M/M/c: Erlang-C probability of waiting, W, Wq, L, Lq and utilisation.
+# G/G/c: Allen-Cunneen approximation, which scales the M/M/c waiting time by
+# (ca^2 + cs^2)/2, the average squared coefficient of variation of the
+# inter-arrival and service times; for c = 1 this is Kingman's formula.
+#
+# All functions take scalars or NumPy arrays of lamb, mu and c and broadcast
+# them against each other, so thousands of configurations are evaluated in
+# one call.  Unstable configurations (lamb >= c*mu) give infinite waits.
+
+
+# import libraries
+
+import numpy as np
+import scipy.stats as stats
+
+
+def erlang_b(c, a):
+    """Erlang-B blocking probability for c servers and offered load a = lamb/mu"""
+    c, a = np.broadcast_arrays(np.asarray(c), np.asarray(a, dtype=float))
+    # ratio of Poisson probabilities, which stays stable for large c
+    return stats.poisson.pmf(c, a)/stats.poisson.cdf(c, a)
+
+
+def erlang_c(c, a):
+    """Erlang-C probability that an arrival has to wait (1 if unstable)"""
+    c = np.asarray(c)
+    a = np.asarray(a, dtype=float)
+    B = erlang_b(c, a)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        C = c*B/(c - a*(1 - B))
+    return np.where(a < c, C, 1.0)[()]
+
+
+def mmc(lamb, mu, c):
+    """steady-state measures of the M/M/c queue
+
+    Returns a dict of arrays (or scalars) rho (utilisation per server),
+    Pwait (Erlang C), Wq, W, Lq and L.
+    """
+    lamb = np.asarray(lamb, dtype=float)
+    mu = np.asarray(mu, dtype=float)
+    c = np.asarray(c)
+    a = lamb/mu
+    rho = a/c
+    C = erlang_c(c, a)
+    with np.errstate(divide="ignore"):
+        Wq = np.where(rho < 1, C/np.maximum(c*mu - lamb, 0), np.inf)
+    W = Wq + 1/mu
+    return {"rho": rho[()],
+            "Pwait": C,
+            "Wq": Wq[()],
+            "W": W[()],
+            "Lq": (lamb*Wq)[()],
+            "L": (lamb*W)[()]}
+
+
+def mmc_wait_tail(lamb, mu, c, t):
+    """P(Wq > t) in the M/M/c queue"""
+    lamb = np.asarray(lamb, dtype=float)
+    mu = np.asarray(mu, dtype=float)
+    c = np.asarray(c)
+    C = erlang_c(c, lamb/mu)
+    return np.where(lamb < c*mu, C*np.exp(-(c*mu - lamb)*np.asarray(t, dtype=float)), 1.0)[()]
+
+
+def allen_cunneen(lamb, mu, c, ca2=1.0, cs2=1.0):
+    """approximate measures of the G/G/c queue (Allen-Cunneen)
+
+    ca2 and cs2 are the squared coefficients of variation of the
+    inter-arrival and service times (1 for exponential, 1/k for a gamma with
+    shape k).  Returns the same dict as mmc().
+    """
+    lamb = np.asarray(lamb, dtype=float)
+    mu = np.asarray(mu, dtype=float)
+    result = mmc(lamb, mu, c)
+    Wq = result["Wq"]*(np.asarray(ca2) + np.asarray(cs2))/2
+    W = Wq + 1/mu
+    result.update({"Wq": Wq[()],
+                   "W": W[()],
+                   "Lq": (lamb*Wq)[()],
+                   "L": (lamb*W)[()]})
+    return result
+
+
+def kingman(lamb, mu, ca2=1.0, cs2=1.0):
+    """Kingman's approximation for the single-server G/G/1 queue"""
+    return allen_cunneen(lamb, mu, 1, ca2, cs2)
+
+
+def squared_cv(x):
+    """squared coefficient of variation of observed times"""
+    x = np.asarray(x, dtype=float)
+    return np.var(x)/np.mean(x)**2
@@ -0,0 +1,63 @@
+##############################
+#
+# Queueing system in action
+# Bueno, G and Kakau, C
+#
+##############################
+
+# independent random number streams for the simulation models.  Each
+# replication gets its own arrival and service generators, spawned from a
+# NumPy SeedSequence built on the replication seed, so draws never depend on
+# the order in which SimPy happens to process events.
+#
+# With common random numbers (streams="crn") the M/M/4, best-fit and
+# empirical models share the streams of a replication; otherwise
+# (streams="independent") each model spawns streams of its own.  All times
+# are drawn by inversion from one uniform per customer, so under common
+# random numbers customer i gets the same uniforms in every model and the
+# differences between models carry less noise.
+
+
+# import libraries
+
+import numpy as np
+import scipy.stats as stats
+
+
+MODELS = ("model", "model2", "model3")
+STREAMS = ("legacy", "crn", "independent")
+
+
+def replication_streams(rvseed, model=None):
+    """(arrival, service) generators of one replication
+
+    model=None gives the common streams shared by all models; a model name
+    from MODELS gives streams of that model alone.
+    """
+    if model is None:
+        seq = np.random.SeedSequence(rvseed)
+    else:
+        seq = np.random.SeedSequence(rvseed, spawn_key=(MODELS.index(model),))
+    arrivals, services = seq.spawn(2)
+    return np.random.default_rng(arrivals), np.random.default_rng(services)
+
+
+def model_streams(streams, rvseed, model):
+    """replication_streams() for the streams option of model(), model2() and model3()"""
+    if streams == "crn":
+        return replication_streams(rvseed)
+    if streams == "independent":
+        return replication_streams(rvseed, model)
+    raise ValueError("streams must be one of %s, not %r" % (STREAMS, streams))
+
+
+###### inversion samplers ############################
+
+def exponential_ppf(u, rate):
+    """inverse cdf of the exponential distribution with the given rate"""
+    return -np.log1p(-np.asarray(u))/rate
+
+
+def gamma_ppf(u, shape, scale):
+    """inverse cdf of the gamma distribution"""
+    return stats.gamma.ppf(u, shape, scale=scale)
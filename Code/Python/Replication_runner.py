@@ -0,0 +1,67 @@
+##############################
+#
+# Queueing system in action
+# Bueno, G and Kakau, C
+#
+##############################
+
+# runs independent replications of model(), model2() or model3() over a pool
+# of worker processes.  The simulations are pure Python, so processes rather
+# than threads are what spreads them over the cpus.
+
+
+# import libraries
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+
+def experiment_seeds(reps, step=123):
+    """seeds used by the experiment loops: replication k uses step*k"""
+    return [step*k for k in range(reps)]
+
+
+def _replicate(model, params, seed):
+    """one replication of model with the given seed"""
+    return model(rvseed=seed, **params)
+
+
+def run_replications(model, seeds, workers=None, pool=None, callback=None, **params):
+    """run model once per seed and return the results in seed order
+
+    params are passed to every call of model, with rvseed set to the seed.
+    workers is the number of processes (default: one per cpu); with
+    workers=1 everything runs in this process, exactly like the serial loop.
+    Every replication seeds its own random number generators, so the results
+    do not depend on the number of workers.  An existing ProcessPoolExecutor
+    can be passed as pool to save starting new processes on every call;
+    workers should then be its number of processes.  callback(seed, result),
+    if given, is called as each replication's result comes in, in seed order.
+    """
+    seeds = list(seeds)
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    run = partial(_replicate, model, params)
+    if pool is None and min(workers, len(seeds)) <= 1:
+        return _collect(seeds, map(run, seeds), callback)
+
+    # hand out seeds in small chunks to keep the pool busy without paying
+    # one round trip per replication
+    chunksize = max(1, len(seeds) // (4*workers))
+    if pool is not None:
+        return _collect(seeds, pool.map(run, seeds, chunksize=chunksize), callback)
+    with ProcessPoolExecutor(max_workers=min(workers, len(seeds))) as pool:
+        return _collect(seeds, pool.map(run, seeds, chunksize=chunksize), callback)
+
+
+def _collect(seeds, results, callback):
+    """list of results, passing each to callback as it arrives"""
+    if callback is None:
+        return list(results)
+    collected = []
+    for seed, result in zip(seeds, results):
+        callback(seed, result)
+        collected.append(result)
+    return collected
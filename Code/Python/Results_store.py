@@ -0,0 +1,138 @@
+##############################
+#
+# Queueing system in action
+# Bueno, G and Kakau, C
+#
+##############################
+
+# persistent store of replication results, in an SQLite file.
+#
+# Every replication is one row keyed by the model, its parameters and the
+# seed.  The runner asks the store which seeds of an experiment are already
+# done, simulates only the others and appends each result as it comes in,
+# so rerunning an unchanged experiment costs nothing and going from 50 to 500
+# replications only runs the 450 new ones.  Plot scripts query the store
+# directly.
+
+
+# import libraries
+
+import json
+import math
+import os
+import sqlite3
+import time
+import pandas as pd
+
+
+DEFAULT_STORE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             "..", "..", "Outputs", "Results", "Simulations", "results.sqlite")
+
+MEASURES = ("W", "L", "B", "LambdaEffective")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS replications (
+    model TEXT NOT NULL,
+    params TEXT NOT NULL,
+    seed INTEGER NOT NULL,
+    W REAL, L REAL, B REAL, LambdaEffective REAL,
+    created REAL NOT NULL,
+    PRIMARY KEY (model, params, seed)
+)
+"""
+
+
+def params_key(params):
+    """canonical text of a parameter dict, the same for equal parameters"""
+    clean = {}
+    for name, value in params.items():
+        if value is None or (isinstance(value, float) and math.isnan(value)):
+            continue
+        if hasattr(value, "item"):
+            value = value.item()
+        # 2000000.0 from the command line is the same as the default 2000000
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        clean[name] = value
+    return json.dumps(clean, sort_keys=True)
+
+
+class ResultsStore:
+    """replication results of all experiments in the SQLite file at path"""
+
+    def __init__(self, path=DEFAULT_STORE):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(SCHEMA)
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def completed(self, model, params):
+        """seeds of the experiment already in the store"""
+        rows = self.connection.execute(
+            "SELECT seed FROM replications WHERE model = ? AND params = ?",
+            (model, params_key(params)))
+        return {seed for (seed,) in rows}
+
+    def add(self, model, params, seed, result):
+        """store one replication's (W, L, B); replaces an earlier result of the seed"""
+        W, L, B = (float(x) for x in result[:3])
+        self.connection.execute(
+            "INSERT OR REPLACE INTO replications VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (model, params_key(params), int(seed), W, L, B,
+             L/W if W else math.nan, time.time()))
+        self.connection.commit()
+
+    def replications(self, model, params, seeds=None):
+        """stored (seed, W, L, B, LambdaEffective) of exactly these parameters, by seed"""
+        rows = self.connection.execute(
+            "SELECT seed, W, L, B, LambdaEffective FROM replications"
+            " WHERE model = ? AND params = ? ORDER BY seed", (model, params_key(params)))
+        results = pd.DataFrame(rows.fetchall(), columns=["seed"] + list(MEASURES))
+        if seeds is not None:
+            results = results[results["seed"].isin(list(seeds))].reset_index(drop=True)
+        return results
+
+    def experiments(self, model=None):
+        """model, parameters, replications and last update of the stored experiments"""
+        query = ("SELECT model, params, COUNT(*), MAX(created) FROM replications"
+                 + (" WHERE model = ?" if model else "")
+                 + " GROUP BY model, params ORDER BY MAX(created)")
+        rows = self.connection.execute(query, (model,) if model else ())
+        return pd.DataFrame([(m, json.loads(p), n, t) for m, p, n, t in rows],
+                            columns=["model", "params", "reps", "updated"])
+
+    def results(self, model, seeds=None, **params):
+        """stored replications of model whose parameters include params
+
+        Returns one row per replication, ordered by seed, with the parameters
+        as columns.  The params must single out one experiment: a LookupError
+        lists the experiments when they match several.
+        """
+        wanted = json.loads(params_key(params))
+        # stored keys compared in the same canonical form as the params
+        matching = [p for p in self.experiments(model)["params"]
+                    if all(json.loads(params_key(p)).get(name) == value
+                           for name, value in wanted.items())]
+        if not matching:
+            return pd.DataFrame(columns=["model", "seed"] + list(MEASURES))
+        if len(matching) > 1:
+            raise LookupError("%d stored experiments of %s match %s, give more parameters:\n%s"
+                              % (len(matching), model, wanted,
+                                 "\n".join(params_key(p) for p in matching)))
+
+        results = self.replications(model, matching[-1], seeds)
+        for name, value in reversed(list(matching[-1].items())):
+            results.insert(0, name, value)
+        results.insert(0, "model", model)
+        return results
@@ -0,0 +1,320 @@
+##############################
+#
+# Queueing system in action
+# Bueno, G and Kakau, C
+#
+##############################
+
+# command-line entry point for the replication experiments.
+#
+#   python Run_experiment.py --model model --reps 50 --workers 8
+#   python Run_experiment.py --model model3 --servers 3 --out three.csv
+#   python Run_experiment.py --model model --reps 500    # only runs the 450 new ones
+#   python Run_experiment.py --model model --delays --wait-over 120   # P95 wait, P(wait > 2 min)
+#
+# runs model (M/M/c), model2 (best fit) or model3 (empirical) once per seed,
+# prints the estimates with their confidence intervals.  Every replication is
+# appended to the results store (Results_store.py) as it finishes, and seeds
+# already in the store are not simulated again; the plot scripts read the
+# store with load_results().  --out also writes the replications to a csv file.
+
+
+# import libraries
+
+import argparse
+import math
+import os
+import numpy as np
+import pandas as pd
+from Replication_runner import experiment_seeds, run_replications
+from Results_store import DEFAULT_STORE, ResultsStore
+from Delay_sketch import THRESHOLDS, merge as merge_delays
+from Occupancy import merge as merge_occupancy
+
+
+MODELS = ("model", "model2", "model3")
+
+MEASURES = ("W", "L", "B", "LambdaEffective")
+
+# columns of the Instrument report
+REPORT_FIELDS = ("events", "events_per_second", "peak_event_list", "peak_queue",
+                 "peak_in_system", "draws", "observations", "sampling_s", "monitoring_s",
+                 "scheduling_s", "wall_s", "simulated_time", "wall_per_simulated_hour")
+
+# parameters of the original experiments
+DEFAULTS = {"model": {"lamb": 1/23.02481, "mu": 1/34.00496, "maxtime": 2000000},
+            "model2": {"lamb": 1/23, "mu": 1/34, "maxtime": 2000000},
+            "model3": {"lamb": math.nan, "mu": math.nan, "maxtime": 20000}}
+
+def model_function(model):
+    """the simulation function of a model name"""
+    if model == "model":
+        from MM4_simulation import model as function
+    elif model == "model2":
+        from Best_fit_simulation import model2 as function
+    elif model == "model3":
+        from Empirical_simulation import model3 as function
+    else:
+        raise ValueError("model must be one of %s, not %r" % (MODELS, model))
+    return function
+
+
+def empirical_inputs(data_path=None, session=None, servers=None, lane=None):
+    """inter-arrival and service distributions of model3 from the observations"""
+    from Data_loading import DEFAULT_PATH, load_data
+    from Distribution_index import DistributionIndex
+    index = DistributionIndex(load_data(data_path or DEFAULT_PATH))
+    return index.get(session, servers, lane)
+
+
+def experiment_params(model, c=4, N=10000, lamb=None, mu=None, maxtime=None,
+                      engine="simpy", streams="legacy", data_path=None, session=None,
+                      servers=None, lane=None):
+    """parameters that identify an experiment in the results store"""
+    defaults = DEFAULTS[model]
+    # busy: B is the per-server utilisation, not the old busy indicator of
+    # the replications stored before it
+    params = {"c": c, "N": N,
+              "maxtime": defaults["maxtime"] if maxtime is None else maxtime,
+              "engine": engine, "streams": streams, "busy": "servers"}
+    if model == "model3":
+        from Data_loading import DEFAULT_PATH, file_hash
+        # the observations are identified by their contents, not their path
+        params.update({"data": file_hash(data_path or DEFAULT_PATH)[:16],
+                       "session": session, "servers": servers, "lane": lane})
+    else:
+        params["lamb"] = defaults["lamb"] if lamb is None else lamb
+        params["mu"] = defaults["mu"] if mu is None else mu
+    return params
+
+
+def theoretic_measures(model, c=4, lamb=None, mu=None, data_path=None):
+    """closed-form measures of model with its own inter-arrival and service times
+
+    Allen-Cunneen approximation of the G/G/c queue (see Queueing_theory),
+    with the means and squared coefficients of variation of the model's
+    distributions: the M/M/c formulas for model, gamma inter-arrival times
+    for model2 and the observations for model3.  lamb and mu default to the
+    values of the original experiment.  Returns the dict of allen_cunneen().
+    """
+    from Batch_simulation import model_inputs, squared_cvs
+    from Queueing_theory import allen_cunneen
+    if model == "model3":
+        arr_data, serv_data = empirical_inputs(data_path)
+        inputs = model_inputs(model, arr_data=arr_data, serv_data=serv_data)
+    else:
+        defaults = DEFAULTS[model]
+        inputs = model_inputs(model, defaults["lamb"] if lamb is None else lamb,
+                              defaults["mu"] if mu is None else mu)
+    ca2, cs2 = squared_cvs(inputs)
+    return allen_cunneen(1/inputs["interarrival_mean"], 1/inputs["service_mean"], c, ca2, cs2)
+
+
+def run_experiment(model, c=4, N=10000, lamb=None, mu=None, maxtime=None, reps=50,
+                   step=123, workers=None, engine="simpy", streams="legacy",
+                   data_path=None, session=None, servers=None, lane=None, store=None,
+                   instrument=False, delays=False, occupancy=False):
+    """one replication of model per seed step*k, k < reps, as a DataFrame
+
+    lamb, mu and maxtime default to the values of the original experiment
+    of the model.  model3 draws from the observations in data_path,
+    optionally only those of one session, server count or lane.  With a
+    ResultsStore as store, seeds already stored are read from it and every
+    new replication is added to it as it finishes.  Returns one row per
+    replication with the parameters, the seed and the measures.  With
+    instrument=True every seed is simulated (stored ones too, to time them)
+    and the rows also hold the counters of the Instrument report.  With
+    delays=True every seed is simulated too, the rows hold the percentiles
+    of the replication's waits and sojourn times (see Delay_sketch) and
+    results.attrs["delays"] is the Delays of all replications merged.
+    occupancy=True likewise adds each replication's utilisation, fraction
+    of time all servers are busy and occupancy distribution, and
+    results.attrs["occupancy"], the Occupancy of all replications merged.
+    """
+    params = experiment_params(model, c, N, lamb, mu, maxtime, engine, streams,
+                               data_path, session, servers, lane)
+    seeds = experiment_seeds(reps, step)
+
+    rerun = instrument or delays or occupancy
+    done = store.completed(model, params) if store is not None and not rerun else set()
+    missing = [seed for seed in seeds if seed not in done]
+    if missing:
+        arguments = {name: params[name] for name in ("c", "N", "maxtime", "engine", "streams")}
+        if instrument:
+            arguments["instrument"] = True
+        if delays:
+            arguments["delays"] = True
+        if occupancy:
+            arguments["occupancy"] = True
+        if model == "model3":
+            arguments["arr_data"], arguments["serv_data"] = empirical_inputs(data_path, session,
+                                                                             servers, lane)
+        else:
+            arguments["lamb"], arguments["mu"] = params["lamb"], params["mu"]
+        callback = None
+        if store is not None:
+            callback = lambda seed, result: store.add(model, params, seed, result)
+        new = run_replications(model_function(model), missing, workers,
+                               callback=callback, **arguments)
+    else:
+        new = []
+
+    measures = dict(zip(missing, new))
+    if done:
+        stored = store.replications(model, params, seeds)
+        for row in stored.itertuples(index=False):
+            measures[row.seed] = (row.W, row.L, row.B)
+
+    W, L, B = (np.array(measure, dtype=float)
+               for measure in zip(*(measures[seed][:3] for seed in seeds)))
+    results = pd.DataFrame({"model": model, "seed": seeds, "W": W, "L": L, "B": B,
+                            "LambdaEffective": L/W})
+    for name, value in reversed(list(params.items())):
+        results.insert(1, name, value)
+    # the extra outputs follow W, L and B in this order
+    extras = [name for name, wanted in (("instrument", instrument), ("delays", delays),
+                                        ("occupancy", occupancy)) if wanted]
+    outputs = {name: [measures[seed][3 + i] for seed in seeds]
+               for i, name in enumerate(extras)}
+    if instrument:
+        results = pd.concat([results, pd.DataFrame(outputs["instrument"])], axis=1)
+    if delays:
+        reports = pd.DataFrame([sketch.report() for sketch in outputs["delays"]])
+        results = pd.concat([results, reports], axis=1)
+    if occupancy:
+        reports = pd.DataFrame([servers.report() for servers in outputs["occupancy"]])
+        results = pd.concat([results, reports], axis=1)
+    # merged over the replications (set last: concat drops attrs)
+    if delays:
+        results.attrs["delays"] = merge_delays(outputs["delays"])
+    if occupancy:
+        results.attrs["occupancy"] = merge_occupancy(outputs["occupancy"])
+    return results
+
+
+def write_results(results, path):
+    """write the replications of run_experiment() to a csv file"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    results.to_csv(path, index=False)
+
+
+def load_results(source, store=DEFAULT_STORE, **params):
+    """replications of a model from the results store, or of a csv file
+
+    source is a model name, whose replications are read from the store
+    (the one experiment whose parameters include params, e.g. all of
+    experiment_params(source) for the report's experiment), or the path of
+    a csv file written with --out.
+    """
+    if source in MODELS:
+        if not os.path.exists(store):
+            raise FileNotFoundError("no results store %s; run Run_experiment.py first" % store)
+        with ResultsStore(store) as results_store:
+            results = results_store.results(source, **params)
+        if len(results) == 0:
+            raise LookupError("no stored replications of %s with %s; run Run_experiment.py first"
+                              % (source, params))
+        return results
+    return pd.read_csv(source)
+
+
+def summary(results):
+    """estimate and confidence interval of every measure"""
+    from MM4_simulation import conf
+    lines = []
+    for measure in MEASURES:
+        lines.append("Estimate of %s: %s" % (measure, np.mean(results[measure])))
+        lower, upper = conf(results[measure])
+        lines.append("Conf int of %s: (%s, %s)" % (measure, lower, upper))
+    return "\n".join(lines)
+
+
+def instrument_summary(results):
+    """mean of the instrumentation counters over the replications"""
+    names = [name for name in results.columns if name in REPORT_FIELDS]
+    return "\n".join("Mean %s: %s" % (name, results[name].mean()) for name in names)
+
+
+def delay_summary(delays, thresholds=THRESHOLDS):
+    """percentiles and tail probabilities of the merged waits and sojourn times"""
+    return "\n".join("%s: %s" % (name, value)
+                     for name, value in delays.report(thresholds=thresholds).items())
+
+
+def occupancy_summary(results):
+    """utilisation and P(all busy) over the replications, and the pooled occupancy"""
+    from MM4_simulation import conf
+    lines = []
+    for name in ("utilisation", "all_busy"):
+        lines.append("Estimate of %s: %s" % (name, np.mean(results[name])))
+        lower, upper = conf(results[name])
+        lines.append("Conf int of %s: (%s, %s)" % (name, lower, upper))
+    distribution = results.attrs["occupancy"].distribution()
+    lines.append("Fraction of time with k busy servers: "
+                 + ", ".join("%d: %.4f" % (k, p) for k, p in enumerate(distribution)))
+    return "\n".join(lines)
+
+
+def parser():
+    p = argparse.ArgumentParser(description="Replications of the ticket booth queueing models.")
+    p.add_argument("--model", choices=MODELS, default="model",
+                   help="model (M/M/c), model2 (best fit) or model3 (empirical)")
+    p.add_argument("-c", type=int, default=4,
+                   help="number of servers (default 4)")
+    p.add_argument("--lamb", type=float, help="arrival rate (model, model2)")
+    p.add_argument("--mu", type=float, help="service rate (model, model2)")
+    p.add_argument("-N", type=int, default=10000, help="customers per replication")
+    p.add_argument("--maxtime", type=float, help="simulated time per replication")
+    p.add_argument("--reps", type=int, default=50, help="number of replications")
+    p.add_argument("--step", type=int, default=123,
+                   help="replication k uses the seed step*k (default 123)")
+    p.add_argument("--workers", type=int, help="worker processes (default: one per cpu)")
+    p.add_argument("--engine", choices=("simpy", "lindley"), default="simpy")
+    p.add_argument("--streams", choices=("legacy", "crn", "independent"), default="legacy")
+    p.add_argument("--data", help="observations csv file (model3)")
+    p.add_argument("--session", type=int, help="use only this session's observations (model3)")
+    p.add_argument("--servers", type=int, help="use only sessions with this many servers (model3)")
+    p.add_argument("--lane", type=int, help="use only this lane's observations (model3)")
+    p.add_argument("--store", default=DEFAULT_STORE,
+                   help="results store (default Outputs/Results/Simulations/results.sqlite)")
+    p.add_argument("--no-store", action="store_true",
+                   help="simulate every seed and keep nothing in the store")
+    p.add_argument("--instrument", action="store_true",
+                   help="count events and time sampling, monitoring and scheduling (simpy engine)")
+    p.add_argument("--delays", action="store_true",
+                   help="percentiles of the waits and sojourn times, and P(wait > t)")
+    p.add_argument("--wait-over", type=float, nargs="+", default=list(THRESHOLDS),
+                   help="the t (s) of P(wait > t) with --delays (default 60 120 300)")
+    p.add_argument("--occupancy", action="store_true",
+                   help="utilisation, P(all servers busy) and the busy-server distribution")
+    p.add_argument("--out", help="also write the replications to this csv file")
+    return p
+
+
+def main(argv=None):
+    args = parser().parse_args(argv)
+    store = None if args.no_store else ResultsStore(args.store)
+    try:
+        results = run_experiment(args.model, args.c, args.N, args.lamb, args.mu, args.maxtime,
+                                 args.reps, args.step, args.workers, args.engine, args.streams,
+                                 args.data, args.session, args.servers, args.lane, store,
+                                 args.instrument, args.delays, args.occupancy)
+    finally:
+        if store is not None:
+            store.close()
+    print(summary(results))
+    if args.instrument:
+        print(instrument_summary(results))
+    if args.delays:
+        print(delay_summary(results.attrs["delays"], args.wait_over))
+    if args.occupancy:
+        print(occupancy_summary(results))
+    if args.out:
+        write_results(results, args.out)
+        print("Replications written to", args.out)
+    return results
+
+
+if __name__ == "__main__":
+    main()
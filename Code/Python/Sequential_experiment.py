@@ -0,0 +1,98 @@
+##############################
+#
+# Queueing system in action
+# Bueno, G and Kakau, C
+#
+##############################
+
+# sequential stopping for the replication experiments: rather than always
+# running 50 replications, run them in parallel batches and stop as soon as
+# the confidence intervals of W, L and B are as narrow as asked for.
+
+
+# import libraries
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from Replication_runner import run_replications
+from Streaming_monitor import StreamingMonitor
+
+
+MEASURES = ("W", "L", "B", "LambdaEffective")
+
+
+def half_width(monitor):
+    """half-width of the 95% interval from conf(): 1.96*std/sqrt(n)
+
+    Infinite with fewer than two observations, which give no spread.
+    """
+    if monitor.count() < 2:
+        return math.inf
+    return 1.96*monitor.std()/math.sqrt(monitor.count())
+
+
+def relative_half_width(monitor):
+    """half-width as a fraction of the estimate"""
+    width = half_width(monitor)
+    mean = monitor.mean()
+    if math.isinf(width) or mean == 0:
+        return math.inf
+    return width/abs(mean)
+
+
+def run_until_precise(model, targets, max_reps=1000, min_reps=10, batch=None,
+                      workers=None, step=123, **params):
+    """replicate model until every target relative half-width is met
+
+    targets maps measures to relative half-widths, e.g.
+    {"W": 0.01, "L": 0.01, "B": 0.005}.  Replications use the seeds of the
+    experiment loops (step*k) and run batch at a time over workers
+    processes, up to max_reps.  No stopping decision is made before
+    min_reps replications.  Returns a dict with the per-replication lists
+    allW, allL, allB, allLambdaEffective, the intervals (lower, upper) of
+    each measure, the number of replications and whether the targets were met.
+    """
+    for measure in targets:
+        if measure not in MEASURES:
+            raise ValueError("unknown measure %r, expected one of %s" % (measure, MEASURES))
+    if min_reps < 1:
+        raise ValueError("min_reps must be at least 1, not %r" % (min_reps,))
+    if max_reps < min_reps:
+        raise ValueError("max_reps (%r) must be at least min_reps (%r)" % (max_reps, min_reps))
+    if batch is not None and batch < 1:
+        raise ValueError("batch must be at least 1, not %r" % (batch,))
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if batch is None:
+        batch = max(min_reps, 2*workers)
+
+    # running mean and variance of each measure, updated batch by batch
+    monitors = {m: StreamingMonitor(name=m) for m in MEASURES}
+    results = {"all" + m: [] for m in MEASURES}
+
+    def precise():
+        n = monitors["W"].count()
+        return n >= min_reps and all(relative_half_width(monitors[m]) <= target
+                                     for m, target in targets.items())
+
+    k = 0
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        while k < max_reps and not precise():
+            seeds = [step*j for j in range(k, min(k + batch, max_reps))]
+            for W, L, B in run_replications(model, seeds, workers=workers, pool=pool, **params):
+                for m, value in zip(MEASURES, (W, L, B, L/W)):
+                    monitors[m].observe(value, t=k)
+                    results["all" + m].append(value)
+                k += 1
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    results["intervals"] = {m: (monitors[m].mean() - half_width(monitors[m]),
+                                monitors[m].mean() + half_width(monitors[m]))
+                            for m in MEASURES}
+    results["reps"] = k
+    results["converged"] = precise()
+    return results
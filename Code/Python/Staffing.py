@@ -0,0 +1,153 @@
+##############################
+#
+# Queueing system in action
+# Bueno, G and Kakau, C
+#
+##############################
+
+# how many booths do we need?  minimum_servers() finds the smallest number of
+# servers c that meets a service-level target, in two steps:
+#   1. screen every c with the closed-form M/M/c (or Allen-Cunneen G/G/c)
+#      results from Queueing_theory, which is instant;
+#   2. simulate only the candidates around the screened answer, in parallel,
+#      with common random numbers so every c sees the same customers.
+#
+# Service levels: the mean wait in queue ("Wq"), the mean time in system
+# ("W"), or the probability of waiting longer than t ("tail").
+
+
+# import libraries
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from Queueing_theory import allen_cunneen
+from Lindley_engine import kiefer_wolfowitz_batch
+from Batch_simulation import draw_uniforms, model_inputs, squared_cvs
+from Replication_runner import experiment_seeds
+
+
+MEASURES = ("Wq", "W", "tail")
+
+
+def analytic_level(lamb, mu, c, measure="Wq", t=None, ca2=1.0, cs2=1.0):
+    """closed-form service level of c servers (exact for M/M/c)"""
+    result = allen_cunneen(lamb, mu, c, ca2, cs2)
+    if measure == "tail":
+        # exponential tail with the mean conditional wait Wq/Pwait;
+        # for M/M/c this is Pwait*exp(-(c*mu - lamb)*t)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            tail = result["Pwait"]*np.exp(-t*result["Pwait"]/result["Wq"])
+        tail = np.where(result["Pwait"] > 0, tail, 0.0)
+        return np.where(np.isfinite(result["Wq"]), tail, 1.0)
+    return result[measure]
+
+
+def screen_servers(lamb, mu, target, measure="Wq", t=None, ca2=1.0, cs2=1.0, c_max=200):
+    """smallest c whose closed-form service level meets target, and the levels of c = 1..c_max"""
+    if measure not in MEASURES:
+        raise ValueError("measure must be one of %s, not %r" % (MEASURES, measure))
+    if measure == "tail" and t is None:
+        raise ValueError("measure='tail' needs the waiting-time limit t")
+
+    c = np.arange(1, c_max + 1)
+    levels = analytic_level(lamb, mu, c, measure, t, ca2, cs2)
+    meets = np.flatnonzero(levels <= target)
+    if len(meets) == 0:
+        raise ValueError("no c up to c_max=%d meets the target" % c_max)
+    return int(c[meets[0]]), dict(zip(c.tolist(), np.asarray(levels).tolist()))
+
+
+def _simulate_levels(model, params, cs, N, maxtime, seeds, streams, measure, t):
+    """per-replication service level of every c in cs, one row per seed"""
+    inputs = model_inputs(model, **params)
+    u_arrivals, u_services = draw_uniforms(seeds, N, model, streams)
+    interarrivals = inputs["interarrival_ppf"](u_arrivals)
+    services = inputs["service_ppf"](u_services)
+
+    # the same customers are served by every c (common random numbers)
+    levels = []
+    for c in cs:
+        arrivals, starts, departures = kiefer_wolfowitz_batch(interarrivals, services, c)
+        left = departures <= maxtime
+        if measure == "Wq":
+            values = starts - arrivals
+        elif measure == "W":
+            values = departures - arrivals
+        else:
+            values = (starts - arrivals) > t
+        levels.append(np.sum(np.where(left, values, 0), axis=1)/np.sum(left, axis=1))
+    return np.column_stack(levels)
+
+
+def simulate_levels(model, params, cs, N, maxtime=math.inf, reps=50, streams="crn",
+                    measure="Wq", t=None, step=123, workers=None):
+    """simulated service level of each c in cs with 95% intervals
+
+    Replications use the seeds step*k, k < reps, spread over workers
+    processes; every c is simulated on the same draws.  Returns a dict
+    mapping c to its estimate, lower and upper limits.
+    """
+    seeds = experiment_seeds(reps, step)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, reps))
+
+    chunks = [seeds[i::workers] for i in range(workers)]
+    args = (model, params, list(cs), N, maxtime)
+    if workers == 1:
+        levels = [_simulate_levels(*args, chunks[0], streams, measure, t)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_simulate_levels, *args, chunk, streams, measure, t)
+                       for chunk in chunks]
+            levels = [future.result() for future in futures]
+    levels = np.concatenate(levels)
+
+    results = {}
+    for j, c in enumerate(cs):
+        y = levels[:, j]
+        estimate = np.mean(y)
+        halfwidth = 1.96*np.std(y)/math.sqrt(len(y))
+        results[c] = {"estimate": estimate,
+                      "lower": estimate - halfwidth,
+                      "upper": estimate + halfwidth}
+    return results
+
+
+def minimum_servers(model, target, measure="Wq", t=None, N=10000, maxtime=math.inf,
+                    reps=50, streams="crn", workers=None, c_max=200, **params):
+    """minimum number of servers meeting the service-level target
+
+    model is "model", "model2" or "model3" and params its distribution
+    parameters (lamb and mu, or arr_data and serv_data).  The closed-form
+    screen (Allen-Cunneen with the inputs' coefficients of variation) gives
+    a first answer c0; c0 - 1, c0 and c0 + 1 are then simulated, and more
+    servers are added until one meets the target with its whole 95%
+    interval.  Returns a dict with the chosen servers, the screened c0, the
+    closed-form levels and the simulated levels of the candidates.
+    """
+    inputs = model_inputs(model, **params)
+    lamb = 1/inputs["interarrival_mean"]
+    mu = 1/inputs["service_mean"]
+    ca2, cs2 = squared_cvs(inputs)
+
+    c0, analytic = screen_servers(lamb, mu, target, measure, t, ca2, cs2, c_max)
+    # smallest stable c: fewer servers than the offered load never settle
+    c_min = int(math.floor(lamb/mu)) + 1
+    candidates = list(range(max(c_min, c0 - 1), c0 + 2))
+
+    simulated = simulate_levels(model, params, candidates, N, maxtime, reps, streams,
+                                measure, t, workers=workers)
+    while simulated[candidates[-1]]["upper"] > target and candidates[-1] < c_max:
+        c = candidates[-1] + 1
+        candidates.append(c)
+        simulated.update(simulate_levels(model, params, [c], N, maxtime, reps, streams,
+                                         measure, t, workers=workers))
+
+    servers = next((c for c in candidates if simulated[c]["upper"] <= target), None)
+    return {"servers": servers,
+            "screened": c0,
+            "analytic": analytic,
+            "simulated": simulated}
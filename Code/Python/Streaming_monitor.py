@@ -0,0 +1,210 @@
+##############################
+#
+# Queueing system in action
+# Bueno, G and Kakau, C
+#
+##############################
+
+# constant-memory replacement for SimPy's Monitor.  A Monitor keeps every
+# (t, y) pair in a list and only reduces them at the end of the run; the
+# StreamingMonitor below keeps running sums instead, so memory does not grow
+# with the number of observations.  It has the same observe(), mean() and
+# timeAverage() surface, so it drops straight into the models.
+#
+# The clock is the sim passed in (anything with now(), e.g. an Event_kernel
+# Environment).  Without one, observe() and the time averages need an
+# explicit t, as for monitors of replication results.
+
+
+# import libraries
+
+import math
+
+
+class P2Quantile:
+    """running estimate of the p-quantile (P-square algorithm, Jain & Chlamtac 1985)"""
+
+    def __init__(self, p):
+        self.p = p
+        self.heights = []                       # marker heights
+        self.positions = [1, 2, 3, 4, 5]        # actual marker positions
+        self.desired = [1, 1 + 2*p, 1 + 4*p, 3 + 2*p, 5]
+        self.increments = [0, p/2, p, (1 + p)/2, 1]
+
+    def observe(self, y):
+        q = self.heights
+        if len(q) < 5:
+            q.append(y)
+            q.sort()
+            return
+
+        # cell containing y, stretching the extreme markers if needed
+        if y < q[0]:
+            q[0] = y
+            k = 0
+        elif y >= q[4]:
+            q[4] = y
+            k = 3
+        else:
+            k = 0
+            while y >= q[k + 1]:
+                k += 1
+
+        n = self.positions
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+
+        # move the middle markers towards their desired positions
+        for i in range(1, 4):
+            d = self.desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                qi = self._parabolic(i, d)
+                if not q[i - 1] < qi < q[i + 1]:
+                    qi = q[i] + d*(q[i + d] - q[i])/(n[i + d] - n[i])
+                q[i] = qi
+                n[i] += d
+
+    def _parabolic(self, i, d):
+        q, n = self.heights, self.positions
+        return q[i] + d/(n[i + 1] - n[i - 1])*(
+            (n[i] - n[i - 1] + d)*(q[i + 1] - q[i])/(n[i + 1] - n[i]) +
+            (n[i + 1] - n[i] - d)*(q[i] - q[i - 1])/(n[i] - n[i - 1]))
+
+    def value(self):
+        q = self.heights
+        if not q:
+            return None
+        if len(q) < 5:
+            # exact quantile of the few observations seen so far
+            return q[min(len(q) - 1, int(round(self.p*(len(q) - 1))))]
+        return q[2]
+
+
+class StreamingMonitor:
+    """running statistics of a monitored variable in O(1) memory
+
+    sim is the clock (anything with now()); without it every observe()
+    and time average needs t.  quantiles is an optional list of
+    probabilities to track with the P-square estimator, e.g.
+    quantiles=(0.5, 0.95).
+    """
+
+    def __init__(self, name='a_Monitor', sim=None, quantiles=()):
+        self.sim = sim
+        self.name = name
+        self.sketches = {p: P2Quantile(p) for p in quantiles}
+        self.reset()
+
+    def reset(self):
+        self.n = 0
+        self._sum = 0.0
+        self._mean = 0.0
+        self._m2 = 0.0                  # sum of squared deviations (Welford)
+        self._min = None
+        self._max = None
+        self.startTime = None
+        self._last_t = None
+        self._last_y = 0.0
+        self._integral = 0.0            # integral of y dt
+        self._integral2 = 0.0           # integral of y^2 dt
+        for p in self.sketches:
+            self.sketches[p] = P2Quantile(p)
+
+    def observe(self, y, t=None):
+        """record y at time t (default: the current simulation time)"""
+        if t is None: t = self._now()
+
+        # time-weighted sums: the previous value held from _last_t to t
+        if self._last_t is None:
+            self.startTime = t
+        else:
+            dt = t - self._last_t
+            self._integral += self._last_y*dt
+            self._integral2 += self._last_y*self._last_y*dt
+        self._last_t = t
+        self._last_y = y
+
+        # observation-weighted sums
+        self.n += 1
+        self._sum += y
+        delta = y - self._mean
+        self._mean += delta/self.n
+        self._m2 += delta*(y - self._mean)
+        if self._min is None or y < self._min: self._min = y
+        if self._max is None or y > self._max: self._max = y
+        for sketch in self.sketches.values():
+            sketch.observe(y)
+
+    def count(self):
+        return self.n
+
+    def __len__(self):
+        return self.n
+
+    def total(self):
+        return self._sum
+
+    def mean(self):
+        """the simple average of the observed values"""
+        if self.n == 0:
+            return None
+        return self._sum/self.n
+
+    def var(self):
+        """the sample variance of the observed values (divisor n, as in Monitor)"""
+        if self.n == 0:
+            return None
+        return self._m2/self.n
+
+    def std(self):
+        if self.n == 0:
+            return None
+        return math.sqrt(self._m2/self.n)
+
+    def min(self):
+        return self._min
+
+    def max(self):
+        return self._max
+
+    def quantile(self, p):
+        """P-square estimate of the p-quantile; p must be one of the tracked quantiles"""
+        if p not in self.sketches:
+            raise KeyError("quantile %r is not tracked by %s" % (p, self.name))
+        return self.sketches[p].value()
+
+    def _now(self):
+        if self.sim is None:
+            raise ValueError("%s has no simulation clock; pass t" % self.name)
+        return self.sim.now()
+
+    def _integrals(self, t):
+        if t is None: t = self._now()
+        dt = t - self._last_t
+        return (t,
+                self._integral + self._last_y*dt,
+                self._integral2 + self._last_y*self._last_y*dt)
+
+    def timeAverage(self, t=None):
+        """the time-weighted average of the monitored variable up to time t (default: now)"""
+        if self.n == 0:
+            return None
+        t, integ, _ = self._integrals(t)
+        T = t - self.startTime
+        if T == 0:
+            return None
+        return integ/float(T)
+
+    def timeVariance(self, t=None):
+        """the time-weighted variance of the monitored variable up to time t (default: now)"""
+        if self.n == 0:
+            return None
+        t, integ, integ2 = self._integrals(t)
+        T = t - self.startTime
+        if T == 0:
+            return None
+        mean = integ/float(T)
+        return integ2/float(T) - mean*mean
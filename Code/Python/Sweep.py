@@ -0,0 +1,268 @@
+##############################
+#
+# Queueing system in action
+# Bueno, G and Kakau, C
+#
+##############################
+
+# parameter sweeps: many scenarios (c, lamb, mu, distribution family, N) at
+# once, instead of editing the arguments of model() and rerunning.
+#
+#   python Sweep.py --model model model2 --c 3 4 5 --lamb 0.03 0.04 --reps 20
+#   python Sweep.py --lhs 200 --c 2:8 --lamb 0.02:0.06 --mu 0.025:0.04 --reps 10
+#
+# grid() builds the full factorial design and latin_hypercube() a space-
+# filling sample of n scenarios.  run_sweep() splits every scenario into its
+# replications and hands all (scenario x replication) tasks to one pool of
+# worker processes, the most expensive first (many customers at high
+# utilisation), so the long runs do not all end up at the tail of the sweep.
+# The result is a tidy table with one row per replication; summarize() reduces
+# it to one row per scenario with confidence intervals.
+
+
+# import libraries
+
+import argparse
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+from Replication_runner import experiment_seeds
+from Batch_simulation import model_inputs
+from Run_experiment import DEFAULTS, MEASURES, empirical_inputs, experiment_params, model_function
+
+
+# axes of a scenario and their defaults
+AXES = {"model": "model", "c": 4, "N": 10000, "lamb": None, "mu": None, "maxtime": None,
+        "engine": "simpy", "streams": "legacy"}
+
+# axes a model does not take: model3 draws from the observations
+IGNORED = {"model3": ("lamb", "mu")}
+
+
+def grid(**axes):
+    """every combination of the values of the axes (full factorial design)
+
+    Each axis is one of AXES and takes a list of values, or a single value.
+    Axes a model ignores are left out of its scenarios, so model3 gets one
+    scenario per combination of the other axes, not one per (lamb, mu).
+    """
+    names = list(axes)
+    values = [v if isinstance(v, (list, tuple, np.ndarray)) else [v] for v in axes.values()]
+    return distinct(dict(zip(names, combination)) for combination in itertools.product(*values))
+
+
+def latin_hypercube(n, ranges, seed=None, fixed=None):
+    """n scenarios spread over ranges by Latin hypercube sampling
+
+    ranges maps an axis to (low, high); c and N are rounded to integers.
+    Every axis is split into n equal strata and each stratum is used once.
+    fixed maps axes to a value, or to a list of values (e.g. models) that
+    are cycled through the scenarios.  As in grid(), axes a model ignores
+    are dropped and repeated scenarios kept once, so there may be fewer
+    than n.
+    """
+    rng = np.random.default_rng(seed)
+    scenarios = [{} for i in range(n)]
+    for name, (low, high) in ranges.items():
+        points = (rng.permutation(n) + rng.random(n))/n
+        values = low + points*(high - low)
+        for scenario, value in zip(scenarios, values):
+            scenario[name] = int(round(value)) if name in ("c", "N") else float(value)
+    for name, value in (fixed or {}).items():
+        values = value if isinstance(value, (list, tuple)) else [value]
+        for i, scenario in enumerate(scenarios):
+            scenario[name] = values[i % len(values)]
+    return distinct(scenarios)
+
+
+def distinct(scenarios):
+    """scenarios without the axes their model ignores, each one once, in order"""
+    seen, result = set(), []
+    for scenario in scenarios:
+        ignored = IGNORED.get(scenario.get("model", AXES["model"]), ())
+        scenario = {name: value for name, value in scenario.items() if name not in ignored}
+        key = tuple(sorted(scenario.items()))
+        if key not in seen:
+            seen.add(key)
+            result.append(scenario)
+    return result
+
+
+def scenario_arguments(scenario, data=None):
+    """model name, model() keyword arguments and utilisation of a scenario
+
+    data is the (inter-arrival, service) pair of distributions used by
+    model3 scenarios.
+    """
+    s = dict(AXES)
+    s.update(scenario)
+    model = s["model"]
+    defaults = DEFAULTS[model]
+    arguments = {"c": s["c"], "N": s["N"],
+                 "maxtime": defaults["maxtime"] if s["maxtime"] is None else s["maxtime"],
+                 "engine": s["engine"], "streams": s["streams"]}
+    if model == "model3":
+        arguments["arr_data"], arguments["serv_data"] = data
+        inputs = model_inputs(model, arr_data=data[0], serv_data=data[1])
+    else:
+        arguments["lamb"] = defaults["lamb"] if s["lamb"] is None else s["lamb"]
+        arguments["mu"] = defaults["mu"] if s["mu"] is None else s["mu"]
+        inputs = model_inputs(model, lamb=arguments["lamb"], mu=arguments["mu"])
+    rho = inputs["service_mean"]/(inputs["interarrival_mean"]*s["c"])
+    return model, arguments, rho
+
+
+def task_cost(N, rho):
+    """relative run time of a replication: more customers and longer queues cost more"""
+    return N/(1 - min(rho, 0.95))
+
+
+def _run_task(model, arguments, seed):
+    """one replication of a scenario"""
+    return model_function(model)(rvseed=seed, **arguments)
+
+
+def run_sweep(scenarios, reps=50, step=123, workers=None, store=None, data_path=None):
+    """all replications of all scenarios as a tidy DataFrame
+
+    Replication k of every scenario uses the seed step*k.  With a
+    ResultsStore as store, replications already stored are reused and new
+    ones are added as they finish.  Returns one row per (scenario,
+    replication) with the scenario number, its parameters, the utilisation
+    rho, the seed and W, L, B and LambdaEffective.
+    """
+    data = None
+    if any(scenario.get("model") == "model3" for scenario in scenarios):
+        data = empirical_inputs(data_path)
+
+    seeds = experiment_seeds(reps, step)
+    rows, tasks = [], []
+    for i, scenario in enumerate(scenarios):
+        model, arguments, rho = scenario_arguments(scenario, data)
+        params = experiment_params(model, arguments["c"], arguments["N"], arguments.get("lamb"),
+                                   arguments.get("mu"), arguments["maxtime"],
+                                   arguments["engine"], arguments["streams"], data_path)
+        info = dict(scenario=i, model=model, **{name: value for name, value in
+                                                params.items() if name != "data"}, rho=rho)
+        stored = store.replications(model, params, seeds) if store is not None else None
+        done = set()
+        if stored is not None:
+            for row in stored.itertuples(index=False):
+                rows.append(dict(info, seed=row.seed, W=row.W, L=row.L, B=row.B))
+                done.add(row.seed)
+        for seed in seeds:
+            if seed not in done:
+                tasks.append((task_cost(arguments["N"], rho), i, info, model, params,
+                              arguments, seed))
+
+    # most expensive tasks first
+    tasks.sort(key=lambda task: -task[0])
+
+    def finished(task, result):
+        cost, i, info, model, params, arguments, seed = task
+        if store is not None:
+            store.add(model, params, seed, result)
+        rows.append(dict(info, seed=seed, W=result[0], L=result[1], B=result[2]))
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or len(tasks) <= 1:
+        for task in tasks:
+            finished(task, _run_task(task[3], task[5], task[6]))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(_run_task, task[3], task[5], task[6]): task for task in tasks}
+            for future in as_completed(futures):
+                finished(futures[future], future.result())
+
+    results = pd.DataFrame(rows).sort_values(["scenario", "seed"], ignore_index=True)
+    results["LambdaEffective"] = results["L"]/results["W"]
+    return results
+
+
+def summarize(results, level=0.95):
+    """mean and confidence interval of every measure in every scenario"""
+    from scipy import stats
+    z = stats.norm.ppf((1 + level)/2)
+    keys = [name for name in results.columns if name not in MEASURES + ("seed",)]
+    grouped = results.groupby(keys, dropna=False)
+    summary = grouped.size().rename("reps").to_frame()
+    for measure in MEASURES:
+        mean = grouped[measure].mean()
+        halfwidth = z*grouped[measure].std(ddof=0)/np.sqrt(summary["reps"])
+        summary[measure] = mean
+        summary[measure + "_lower"] = mean - halfwidth
+        summary[measure + "_upper"] = mean + halfwidth
+    return summary.reset_index().sort_values("scenario", ignore_index=True)
+
+
+def _axis(text, kind):
+    """an axis value from the command line: a number, or low:high for --lhs"""
+    if ":" in text:
+        low, high = text.split(":")
+        return (kind(low), kind(high))
+    return kind(text)
+
+
+def main(argv=None):
+    from Results_store import DEFAULT_STORE, ResultsStore
+    p = argparse.ArgumentParser(description="Parameter sweep over the queueing models.")
+    p.add_argument("--model", nargs="+", default=["model"], choices=("model", "model2", "model3"))
+    p.add_argument("-c", nargs="+", default=["4"], help="servers (low:high with --lhs)")
+    p.add_argument("--lamb", nargs="+", help="arrival rates (low:high with --lhs)")
+    p.add_argument("--mu", nargs="+", help="service rates (low:high with --lhs)")
+    p.add_argument("-N", nargs="+", default=["10000"], help="customers (low:high with --lhs)")
+    p.add_argument("--maxtime", type=float)
+    p.add_argument("--engine", default="simpy", choices=("simpy", "lindley"))
+    p.add_argument("--streams", default="legacy", choices=("legacy", "crn", "independent"))
+    p.add_argument("--lhs", type=int, help="Latin hypercube of this many scenarios")
+    p.add_argument("--seed", type=int, help="seed of the Latin hypercube")
+    p.add_argument("--reps", type=int, default=50)
+    p.add_argument("--step", type=int, default=123)
+    p.add_argument("--workers", type=int)
+    p.add_argument("--store", default=DEFAULT_STORE)
+    p.add_argument("--no-store", action="store_true")
+    p.add_argument("--out", help="csv file of the replications")
+    p.add_argument("--summary", help="csv file of the per-scenario summary")
+    args = p.parse_args(argv)
+
+    axes = {"c": [_axis(v, int) for v in args.c],
+            "N": [_axis(v, int) for v in args.N]}
+    if args.lamb:
+        axes["lamb"] = [_axis(v, float) for v in args.lamb]
+    if args.mu:
+        axes["mu"] = [_axis(v, float) for v in args.mu]
+    fixed = {"model": args.model, "maxtime": args.maxtime, "engine": args.engine,
+             "streams": args.streams}
+
+    if args.lhs:
+        ranges = {name: values[0] for name, values in axes.items()
+                  if isinstance(values[0], tuple)}
+        fixed.update({name: values[0] for name, values in axes.items()
+                      if not isinstance(values[0], tuple)})
+        scenarios = latin_hypercube(args.lhs, ranges, args.seed, fixed)
+    else:
+        scenarios = grid(**axes, **{name: value for name, value in fixed.items()})
+
+    store = None if args.no_store else ResultsStore(args.store)
+    try:
+        results = run_sweep(scenarios, args.reps, args.step, args.workers, store)
+    finally:
+        if store is not None:
+            store.close()
+
+    summary = summarize(results)
+    with pd.option_context("display.width", 200, "display.max_columns", 20):
+        columns = ["scenario", "model", "c", "N", "lamb", "mu", "rho", "reps", "W", "L", "B"]
+        print(summary[[name for name in columns if name in summary]].to_string(index=False))
+    if args.out:
+        results.to_csv(args.out, index=False)
+    if args.summary:
+        summary.to_csv(args.summary, index=False)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+##############################
+#
+# Queueing system in action
+# Bueno, G and Kakau, C
+#
+##############################
+
+# variance reduction for the replication experiments.
+#
+# Antithetic variates: every replication is run twice, once on its uniforms
+# U and once on 1-U, and the two results are averaged.  Long inter-arrival
+# times in one run are short in the other, so the pair average varies less
+# than two independent runs.
+#
+# Control variates: the sample means of the inter-arrival and service times
+# actually drawn in a replication have known expectations (1/lamb, 1/mu for
+# the M/M/c model).  Regressing W, L and B on the deviations of those sample
+# means from their expectations, and reading off the fit at zero deviation,
+# removes the part of the noise explained by unlucky input draws.
+
+
+# import libraries
+
+import math
+import numpy as np
+from Lindley_engine import simulate_replications
+from Batch_simulation import draw_uniforms, model_inputs
+from Replication_runner import experiment_seeds
+
+
+MEASURES = ("W", "L", "B")
+
+
+def replicate(inputs, c, N, maxtime, seeds, model, streams="crn", antithetic=False, chunk=500):
+    """outputs and input means of one replication per seed
+
+    inputs is a model_inputs() dict.  Returns Y, a (reps x 3) array of W, L
+    and B, and X, a (reps x 2) array of the sample means of the inter-arrival
+    and service times.  With antithetic=True each row is the average of the
+    runs on U and on 1-U.
+    """
+    seeds = list(seeds)
+    Y, X = [], []
+    for first in range(0, len(seeds), chunk):
+        u_arrivals, u_services = draw_uniforms(seeds[first:first + chunk], N, model, streams)
+        pairs = [(u_arrivals, u_services)]
+        if antithetic:
+            pairs.append((1 - u_arrivals, 1 - u_services))
+
+        outputs, means = [], []
+        for ua, us in pairs:
+            interarrivals = inputs["interarrival_ppf"](ua)
+            services = inputs["service_ppf"](us)
+            outputs.append(np.column_stack(simulate_replications(interarrivals, services, c,
+                                                                 maxtime, inputs["busy"])))
+            means.append(np.column_stack((interarrivals.mean(axis=1), services.mean(axis=1))))
+        Y.append(np.mean(outputs, axis=0))
+        X.append(np.mean(means, axis=0))
+    return np.concatenate(Y), np.concatenate(X)
+
+
+def plain_estimate(y):
+    """mean and the 95% interval of conf()"""
+    y = np.asarray(y, dtype=float)
+    estimate = np.mean(y)
+    halfwidth = 1.96*np.std(y)/math.sqrt(len(y))
+    return {"estimate": estimate, "lower": estimate - halfwidth, "upper": estimate + halfwidth}
+
+
+def control_variate_estimate(y, X, means):
+    """control-variate estimate of E[y] with controls X of known means
+
+    Fits y = a + (X - means) b by least squares over the replications; the
+    estimate is a and its standard error comes from the fit.  Returns the
+    estimate, the 95% interval and the fitted coefficients b.
+    """
+    y = np.asarray(y, dtype=float)
+    X = np.asarray(X, dtype=float).reshape(len(y), -1)
+    n, q = X.shape
+    if n <= q + 1:
+        raise ValueError("need more than %d replications for %d controls" % (q + 1, q))
+
+    A = np.column_stack((np.ones(n), X - np.asarray(means, dtype=float)))
+    coef = np.linalg.lstsq(A, y, rcond=None)[0]
+    residuals = y - A @ coef
+    s2 = residuals @ residuals/(n - q - 1)
+    se = math.sqrt(s2*np.linalg.inv(A.T @ A)[0, 0])
+
+    estimate = coef[0]
+    return {"estimate": estimate,
+            "lower": estimate - 1.96*se,
+            "upper": estimate + 1.96*se,
+            "beta": coef[1:]}
+
+
+def vr_experiment(model, c, N, maxtime, reps, antithetic=True, control=True,
+                  streams="crn", step=123, **params):
+    """W, L and B of model with antithetic and/or control variates
+
+    model is "model", "model2" or "model3" and params its distribution
+    parameters (lamb and mu, or arr_data and serv_data).  Replications use
+    the seeds step*k, k < reps; with antithetic=True each one is an
+    antithetic pair, so twice as many runs are simulated.  Returns a dict
+    with an estimate and 95% interval for each measure, plus the raw
+    per-replication outputs Y and input means X.
+    """
+    inputs = model_inputs(model, **params)
+    Y, X = replicate(inputs, c, N, maxtime, experiment_seeds(reps, step), model,
+                     streams, antithetic)
+    means = (inputs["interarrival_mean"], inputs["service_mean"])
+
+    results = {"Y": Y, "X": X, "reps": reps}
+    for j, measure in enumerate(MEASURES):
+        if control:
+            results[measure] = control_variate_estimate(Y[:, j], X, means)
+        else:
+            results[measure] = plain_estimate(Y[:, j])
+    return results
@@ -0,0 +1,5 @@
+# the modules in Code/Python are flat scripts, imported by name
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
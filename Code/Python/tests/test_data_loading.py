@@ -0,0 +1,16 @@
+import os
+import Data_loading
+from Data_loading import DEFAULT_PATH, cache_file, load_data
+
+
+def test_cache_is_rebuilt_when_the_parsing_changes(tmp_path, monkeypatch):
+    data = load_data(DEFAULT_PATH, cache_dir=str(tmp_path))
+    old = cache_file(DEFAULT_PATH, str(tmp_path))
+    assert os.path.exists(old)
+
+    monkeypatch.setattr(Data_loading, "CACHE_VERSION", Data_loading.CACHE_VERSION + 1)
+    new = cache_file(DEFAULT_PATH, str(tmp_path))
+    assert new != old and not os.path.exists(new)
+    reparsed = load_data(DEFAULT_PATH, cache_dir=str(tmp_path))
+    assert os.path.exists(new)
+    assert reparsed.equals(data)
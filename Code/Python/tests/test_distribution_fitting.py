@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+from Distribution_fitting import anderson_darling, fit
+
+
+def textbook_ad(x, fit):
+    z = np.sort(fit.distribution().cdf(x))
+    n = len(x)
+    i = np.arange(1, n + 1)
+    return -n - np.sum((2*i - 1)*(np.log(z) + np.log(1 - z[::-1])))/n
+
+
+@pytest.fixture
+def sample():
+    return np.random.default_rng(0).exponential(20, 400)
+
+
+def test_ad_matches_textbook_formula(sample):
+    f = fit(sample, "exponential")
+    assert anderson_darling(sample, f)["ad"] == pytest.approx(textbook_ad(sample, f))
+
+
+def test_discrete_ad_matches_continuous_on_unrounded_data(sample):
+    f = fit(sample, "exponential")
+    continuous = anderson_darling(sample, f)["ad"]
+    assert anderson_darling(sample, f, resolution=1e-6)["ad"] == pytest.approx(continuous,
+                                                                               rel=1e-6)
+
+
+def test_ad_stable_with_one_outlier(sample):
+    f = fit(sample, "exponential")
+    before = anderson_darling(np.round(sample), f, resolution=1)["ad"]
+    with_outlier = np.append(sample, 400)
+    g = fit(with_outlier, "exponential")
+    for resolution, x in ((None, with_outlier), (1, np.round(with_outlier))):
+        after = anderson_darling(x, g, resolution)["ad"]
+        assert after < 2
+        assert abs(after - before) < 1
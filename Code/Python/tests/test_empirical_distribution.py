@@ -0,0 +1,49 @@
+import random
+import numpy as np
+import pytest
+from Data_loading import load_data
+from Empirical_distribution import EmpiricalDistribution
+from Empirical_simulation import draw_empirical
+
+
+def original_draw_empirical(data, r):
+    """draw_empirical() of the original Empirical_simulation.py, unchanged"""
+    d = {x: data.count(x) for x in data}
+    obs_values, freq = zip( *sorted( zip(d.keys(), d.values())))
+    obs_values = list(obs_values)
+    freq = list(freq)
+    empf = [x*1.0/len(data) for x in freq]
+    ecum = np.cumsum(empf).tolist()
+    ecum.insert(0, 0)
+    obs_values.insert(0,0)
+
+    for x in ecum:
+         if r <= x:
+            rpt = x
+            break
+    r_end = ecum.index(rpt)
+    y = obs_values[r_end] - 1.0*(ecum[r_end]-r)*(obs_values[r_end]-
+        obs_values[r_end-1])/(ecum[r_end]-ecum[r_end-1])
+    return y
+
+
+def observations():
+    """arrival and service data as the original script built them from the csv"""
+    data = load_data()
+    arrive = data["Date_Arrive"]
+    arr_data = [0] + [(arrive[i] - arrive[i - 1]).seconds for i in range(1, len(arrive))]
+    serv_data = data["Serv_time_sec"].tolist()
+    return {"arrivals": arr_data, "services": serv_data}
+
+
+@pytest.mark.parametrize("name", ["arrivals", "services"])
+def test_same_draws_as_original_draw_empirical(name):
+    data = observations()[name]
+    distribution = EmpiricalDistribution(data)
+    for seed in (0, 123):
+        random.seed(seed)
+        u = [random.random() for i in range(300)] + [0.0, 1.0]
+        expected = [original_draw_empirical(data, r) for r in u]
+        assert [distribution.draw(r) for r in u] == expected
+        assert [draw_empirical(data, r) for r in u] == expected
+        assert distribution.ppf(u) == pytest.approx(expected, rel=1e-12, abs=1e-12)
@@ -0,0 +1,39 @@
+import pytest
+from Queue_model import queue_model
+from Run_experiment import DEFAULTS, empirical_inputs
+
+BUSY = ("servers", "time", "mean")
+
+
+@pytest.fixture(scope="module")
+def data():
+    return empirical_inputs()
+
+
+def make(model, data, busy):
+    if model == "model3":
+        q = queue_model(model, 4, arr_data=data[0], serv_data=data[1])
+    else:
+        q = queue_model(model, 4, lamb=DEFAULTS[model]["lamb"], mu=DEFAULTS[model]["mu"])
+    q.busy = busy
+    return q
+
+
+@pytest.mark.parametrize("busy", BUSY)
+@pytest.mark.parametrize("model", ("model", "model2", "model3"))
+def test_event_kernel_matches_lindley(model, busy, data):
+    # with common random numbers both engines serve the same customers
+    maxtime = DEFAULTS[model]["maxtime"]
+    for seed in (0, 123):
+        kernel = make(model, data, busy).run(2000, maxtime, seed, engine="simpy", streams="crn")
+        lindley = make(model, data, busy).run(2000, maxtime, seed, engine="lindley",
+                                              streams="crn")
+        assert kernel == pytest.approx(lindley, rel=1e-9)
+
+
+def test_event_kernel_reproduces_simpy():
+    # (W, L, B) of model(), seed 0, recorded with SimPy 2 before the kernel
+    q = make("model", None, "mean")
+    W, L, B = q.run(2000, 2e6, 0)
+    assert (W, L, B) == pytest.approx((35.198622393135246, 1.4880025411193252, 0.8815),
+                                      rel=1e-12)
@@ -0,0 +1,39 @@
+from concurrent.futures import ProcessPoolExecutor
+import pytest
+from Best_fit_simulation import model2
+from Empirical_simulation import model3
+from MM4_simulation import model
+from Replication_runner import experiment_seeds, run_replications
+from Run_experiment import DEFAULTS, empirical_inputs
+
+
+def cases():
+    arr_data, serv_data = empirical_inputs()
+    return [(model, dict(c=4, N=300, lamb=DEFAULTS["model"]["lamb"],
+                         mu=DEFAULTS["model"]["mu"], maxtime=2000000)),
+            (model2, dict(c=4, N=300, lamb=DEFAULTS["model2"]["lamb"],
+                          mu=DEFAULTS["model2"]["mu"], maxtime=2000000)),
+            (model3, dict(c=4, N=300, maxtime=20000, arr_data=arr_data, serv_data=serv_data))]
+
+
+@pytest.mark.parametrize("case", range(3))
+def test_process_pool_gives_the_serial_results(case):
+    function, params = cases()[case]
+    seeds = experiment_seeds(6)
+    serial = run_replications(function, seeds, workers=1, **params)
+    parallel = run_replications(function, seeds, workers=3, **params)
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        pooled = run_replications(function, seeds, workers=2, pool=pool, **params)
+    assert len(serial) == 6
+    assert parallel == serial
+    assert pooled == serial
+
+
+def test_callback_in_seed_order():
+    function, params = cases()[0]
+    seeds = experiment_seeds(4)
+    seen = []
+    results = run_replications(function, seeds, workers=2,
+                               callback=lambda seed, result: seen.append((seed, result)),
+                               **params)
+    assert seen == list(zip(seeds, results))
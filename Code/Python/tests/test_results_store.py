@@ -0,0 +1,39 @@
+import pytest
+from Results_store import ResultsStore
+from Run_experiment import experiment_params, load_results
+
+
+@pytest.fixture
+def store(tmp_path):
+    path = str(tmp_path / "results.sqlite")
+    with ResultsStore(path) as results_store:
+        # the report's experiment, then a sweep scenario of the same model
+        report = experiment_params("model")
+        sweep = experiment_params("model", c=2, lamb=0.05)
+        for seed in (0, 123):
+            results_store.add("model", report, seed, (35.0, 1.5, 0.37))
+            results_store.add("model", sweep, seed, (90.0, 4.5, 0.9))
+    return path
+
+
+def test_report_experiment_is_found_among_others(store):
+    results = load_results("model", store, **experiment_params("model"))
+    assert list(results["W"]) == [35.0, 35.0]
+    assert set(results["c"]) == {4}
+
+
+def test_ambiguous_parameters_raise(store):
+    with pytest.raises(LookupError):
+        load_results("model", store)
+    with pytest.raises(LookupError):
+        load_results("model", store, mu=experiment_params("model")["mu"])
+
+
+def test_float_maxtime_reuses_the_stored_experiment(store):
+    # --maxtime 2000000 is parsed as a float, the default is an int
+    params = experiment_params("model", maxtime=2000000.0)
+    with ResultsStore(store) as results_store:
+        assert results_store.completed("model", params) == {0, 123}
+        results_store.add("model", params, 246, (35.0, 1.5, 0.37))
+    results = load_results("model", store, **params)
+    assert list(results["seed"]) == [0, 123, 246]
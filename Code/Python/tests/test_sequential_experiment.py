@@ -0,0 +1,29 @@
+import math
+import pytest
+from Sequential_experiment import half_width, relative_half_width, run_until_precise
+from MM4_simulation import model
+from Streaming_monitor import StreamingMonitor
+
+
+def test_half_width_is_infinite_below_two_observations():
+    monitor = StreamingMonitor()
+    assert half_width(monitor) == math.inf
+    assert relative_half_width(monitor) == math.inf
+    monitor.observe(35.0, t=0)
+    assert half_width(monitor) == math.inf
+    monitor.observe(36.0, t=1)
+    assert 0 < half_width(monitor) < math.inf
+
+
+@pytest.mark.parametrize("reps", [{"min_reps": 0}, {"max_reps": 0}, {"max_reps": 5, "min_reps": 10}])
+def test_impossible_replication_counts_are_rejected(reps):
+    with pytest.raises(ValueError):
+        run_until_precise(model, {"W": 0.01}, workers=1, N=100, **reps)
+
+
+def test_stops_once_precise():
+    results = run_until_precise(model, {"W": 0.5}, max_reps=20, min_reps=3, batch=3,
+                                workers=1, N=200, lamb=1/23.02481, mu=1/34.00496,
+                                c=4, maxtime=2000000)
+    assert results["converged"]
+    assert results["reps"] == len(results["allW"]) == 3
@@ -0,0 +1,29 @@
+import sys
+import pytest
+from Event_kernel import Environment
+from Streaming_monitor import StreamingMonitor
+
+
+@pytest.fixture
+def no_simpy(monkeypatch):
+    # the monitors must not need the SimPy package
+    monkeypatch.setitem(sys.modules, "SimPy", None)
+
+
+def test_monitor_without_clock(no_simpy):
+    monitor = StreamingMonitor(name="W")
+    for k, y in enumerate((1.0, 3.0, 2.0)):
+        monitor.observe(y, t=k)
+    assert monitor.mean() == 2.0
+    assert monitor.timeAverage(t=3) == 2.0
+    with pytest.raises(ValueError):
+        monitor.observe(1.0)
+
+
+def test_monitor_on_event_kernel(no_simpy):
+    env = Environment()
+    monitor = StreamingMonitor(sim=env)
+    monitor.observe(2)
+    env._t = 4.0
+    monitor.observe(0)
+    assert monitor.timeAverage() == 2.0
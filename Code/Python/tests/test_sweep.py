@@ -0,0 +1,15 @@
+from Sweep import grid, latin_hypercube
+
+
+def test_grid_runs_model3_once_per_lamb_mu():
+    scenarios = grid(model=["model", "model3"], c=[3, 4], lamb=[0.03, 0.04], mu=[0.03, 0.04])
+    assert sum(s["model"] == "model" for s in scenarios) == 8
+    assert [s for s in scenarios if s["model"] == "model3"] == \
+        [{"model": "model3", "c": 3}, {"model": "model3", "c": 4}]
+
+
+def test_latin_hypercube_drops_repeated_model3_scenarios():
+    scenarios = latin_hypercube(20, {"c": (3, 4), "lamb": (0.02, 0.05)}, seed=0,
+                                fixed={"model": "model3"})
+    assert sorted(s["c"] for s in scenarios) == [3, 4]
+    assert all("lamb" not in s for s in scenarios)